@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of the GitHub REST API the scripts use.
+
+Serves a synthetic account on localhost so the scripts can be run and
+measured without touching api.github.com:
+
+    GET  /user/repos
+    GET  /user/orgs
+    GET  /repos/{owner}/{repo}
+    GET  /repos/{owner}/{repo}/pulls
+    GET  /repos/{owner}/{repo}/pulls/{number}
+    PUT  /repos/{owner}/{repo}/pulls/{number}/merge
+    GET  /repos/{owner}/{repo}/branches/{branch}
+    GET  /search/issues
+
+Responses are paginated with Link headers, carry ETags (If-None-Match is
+answered with 304) and X-RateLimit-* headers. Latency and rate limits can
+be injected. GET /_stats returns request and byte counters.
+
+Usage:
+    python benchmarks/fake_github.py [--port 8765] [--repos 50] [--prs-per-repo 4]
+        [--issues 3000] [--latency-ms 50] [--core-limit 5000] [--search-limit 30]
+
+    GITHUB_API_URL=http://127.0.0.1:8765 GITHUB_TOKEN=x GITHUB_USER=octocat \\
+        python scripts/github/report_open_issues.py
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+SEARCH_CAP = 1000
+BOT_LOGIN = "dependabot[bot]"
+OTHER_LOGINS = ["alice", "bob", "carol", "renovate[bot]"]
+LABELS = ["bug", "enhancement", "dependencies", "documentation", "question"]
+
+
+@dataclass
+class FakeConfig:
+    user: str = "octocat"
+    repos: int = 50
+    prs_per_repo: int = 4
+    issues: int = 3000
+    conflict_rate: float = 0.2
+    pending_rate: float = 0.1
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    core_limit: int = 5000
+    search_limit: int = 30
+    rate_window: int = 60
+    seed: int = 42
+
+
+class FakeGitHub:
+    """
+    Synthetic GitHub account plus the request/byte counters and rate-limit
+    buckets of one server instance.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        # Fixed per instance so a reset reproduces identical bodies (and ETags)
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+        self.reset()
+
+    # === Data ===
+
+    def reset(self):
+        """
+        Regenerate the dataset and clear counters and rate limits.
+        """
+        config = self.config
+        rng = random.Random(config.seed)
+        now = self.now
+        with self.lock:
+            self.repos = {}
+            self.pulls = {}
+            # Tip of each repository's main branch; merges move it, PR base.sha does not
+            self.branch_tips = {}
+            self.search_items = []
+            self.stats = {"requests": 0, "bytes": 0, "not_modified": 0, "rate_limited": 0, "endpoints": {}}
+            self.buckets = {
+                "core": [config.core_limit, time.time() + config.rate_window],
+                "search": [config.search_limit, time.time() + config.rate_window],
+            }
+
+            for i in range(config.repos):
+                owner = config.user if i % 5 else "acme-org"
+                full_name = f"{owner}/repo-{i:04d}"
+                self.repos[full_name] = {
+                    "id": 1000 + i,
+                    "name": full_name.split("/")[1],
+                    "full_name": full_name,
+                    "private": i % 3 == 0,
+                    "archived": i % 17 == 16,
+                    "fork": i % 11 == 10,
+                    "owner": {"login": owner},
+                    "permissions": {"admin": owner == config.user, "push": i % 13 != 12, "pull": True},
+                }
+                pulls = []
+                for n in range(1, config.prs_per_repo + 1):
+                    author = BOT_LOGIN if n % 4 else rng.choice(OTHER_LOGINS + [config.user])
+                    pulls.append(self._pull(full_name, n, author, now - timedelta(hours=rng.randint(1, 2000)), rng))
+                self.pulls[full_name] = pulls
+                self.search_items.extend(pulls)
+
+            repo_names = sorted(self.repos)
+            for i in range(config.issues):
+                repo = rng.choice(repo_names)
+                created = now - timedelta(seconds=rng.randint(60, 6 * 365 * 86400))
+                role = rng.random()
+                author = config.user if role < 0.5 else rng.choice(OTHER_LOGINS)
+                assignees = [config.user] if rng.random() < 0.3 else []
+                mentions = [config.user] if role >= 0.5 and rng.random() < 0.6 else []
+                self.search_items.append({
+                    "id": 10_000_000 + i,
+                    "number": 10_000 + i,
+                    "title": f"Synthetic issue {i} in {repo}",
+                    "state": "open",
+                    "html_url": f"https://github.com/{repo}/issues/{10_000 + i}",
+                    "repository_url": f"https://api.github.com/repos/{repo}",
+                    "user": {"login": author},
+                    "assignees": [{"login": login} for login in assignees],
+                    "labels": [{"name": name} for name in rng.sample(LABELS, rng.randint(0, 2))],
+                    "comments": rng.randint(0, 20),
+                    "body": " ".join(f"@{login}" for login in mentions) or "No mentions.",
+                    "created_at": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "_mentions": mentions,
+                    "_reviewers": [],
+                })
+
+    def _pull(self, repo, number, author, created, rng):
+        roll = rng.random()
+        review_requested = author not in (BOT_LOGIN, self.config.user) and rng.random() < 0.5
+        return {
+            "id": int(hashlib.sha1(f"{repo}#{number}".encode()).hexdigest()[:8], 16),
+            "number": number,
+            "title": f"Bump package-{number} from 1.{number}.0 to 1.{number + 1}.0",
+            "state": "open",
+            "html_url": f"https://github.com/{repo}/pull/{number}",
+            "url": f"https://api.github.com/repos/{repo}/pulls/{number}",
+            "repository_url": f"https://api.github.com/repos/{repo}",
+            "user": {"login": author},
+            "assignees": [],
+            "labels": [{"name": "dependencies"}],
+            "comments": 0,
+            "body": "Bumps a dependency.",
+            "created_at": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "head": {"sha": hashlib.sha1(f"{repo}#{number}:head".encode()).hexdigest()},
+            "base": {"ref": "main", "sha": hashlib.sha1(f"{repo}:base".encode()).hexdigest()},
+            "pull_request": {"url": f"https://api.github.com/repos/{repo}/pulls/{number}"},
+            "_conflict": roll < self.config.conflict_rate,
+            "_pending_polls": 1 if roll > 1 - self.config.pending_rate else 0,
+            "_mentions": [],
+            "_reviewers": [self.config.user] if review_requested else [],
+        }
+
+    # === Accounting ===
+
+    def take_token(self, resource):
+        """
+        Returns:
+            tuple[bool, dict]: Whether the request may proceed, and its rate-limit headers.
+        """
+        with self.lock:
+            bucket = self.buckets[resource]
+            limit = self.config.search_limit if resource == "search" else self.config.core_limit
+            if time.time() >= bucket[1]:
+                bucket[0] = limit
+                bucket[1] = time.time() + self.config.rate_window
+            allowed = bucket[0] > 0
+            if allowed:
+                bucket[0] -= 1
+            else:
+                self.stats["rate_limited"] += 1
+            headers = {
+                "X-RateLimit-Limit": str(limit),
+                "X-RateLimit-Remaining": str(bucket[0]),
+                "X-RateLimit-Reset": str(int(bucket[1])),
+                "X-RateLimit-Resource": resource,
+            }
+        return allowed, headers
+
+    def refund_token(self, resource):
+        # Conditional requests answered with 304 do not count against the rate limit
+        with self.lock:
+            self.buckets[resource][0] += 1
+
+    def record(self, endpoint, size, status):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += size
+            if status == 304:
+                self.stats["not_modified"] += 1
+            entry = self.stats["endpoints"].setdefault(endpoint, {"requests": 0, "bytes": 0})
+            entry["requests"] += 1
+            entry["bytes"] += size
+
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps(self.stats))
+
+    # === Search ===
+
+    def search(self, query):
+        """
+        Evaluate the subset of the search syntax the scripts use.
+        """
+        terms = query.split()
+        items = self.search_items
+        for term in terms:
+            key, _, value = term.partition(":")
+            value_lower = value.lower()
+            if term == "is:pr":
+                items = [i for i in items if "pull_request" in i]
+            elif term == "is:issue":
+                items = [i for i in items if "pull_request" not in i]
+            elif term == "is:open":
+                items = [i for i in items if i["state"] == "open"]
+            elif key == "author":
+                login = f"{value[4:]}[bot]" if value.startswith("app/") else value
+                items = [i for i in items if i["user"]["login"].lower() == login.lower()]
+            elif key == "assignee":
+                items = [i for i in items if any(a["login"].lower() == value_lower for a in i["assignees"])]
+            elif key == "mentions":
+                items = [i for i in items if value_lower in (m.lower() for m in i["_mentions"])]
+            elif key == "review-requested":
+                items = [i for i in items if value_lower in (r.lower() for r in i["_reviewers"])]
+            elif key == "involves":
+                items = [i for i in items if self._involves(i, value_lower)]
+            elif key == "created":
+                start, _, end = value.partition("..")
+                items = [i for i in items if start <= i["created_at"] <= (end or "9999")]
+        # Repeated user: qualifiers are alternatives
+        owners = {value.lower() for key, _, value in (t.partition(":") for t in terms) if key == "user"}
+        if owners:
+            items = [i for i in items if i["repository_url"].split("/")[-2].lower() in owners]
+        return sorted(items, key=lambda i: i["created_at"], reverse=True)
+
+    @staticmethod
+    def _involves(item, login):
+        return (
+            item["user"]["login"].lower() == login
+            or any(a["login"].lower() == login for a in item["assignees"])
+            or login in (m.lower() for m in item["_mentions"])
+        )
+
+
+def public(item):
+    return {k: v for k, v in item.items() if not k.startswith("_")}
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeGitHub/1.0"
+    # Headers and body go out in separate writes; with Nagle's algorithm the
+    # body waits for the client's delayed ACK (~40ms) on keep-alive connections
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def fake(self):
+        return self.server.fake
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def _dispatch(self, method):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path.rstrip("/")
+
+        if path == "/_stats":
+            return self._send(200, self.fake.snapshot(), count=False)
+        if path == "/_reset" and method == "PUT":
+            self.fake.reset()
+            return self._send(200, {"reset": True}, count=False)
+
+        config = self.fake.config
+        if config.latency_ms or config.jitter_ms:
+            time.sleep((config.latency_ms + random.uniform(0, config.jitter_ms)) / 1000)
+
+        resource = self._resource = "search" if path.startswith("/search/") else "core"
+        allowed, rate_headers = self.fake.take_token(resource)
+        if not allowed:
+            return self._send(403, {"message": "API rate limit exceeded"}, rate_headers, endpoint=resource)
+
+        m = re.fullmatch(r"/repos/([^/]+/[^/]+)(/pulls(?:/(\d+)(/merge)?)?)?", path)
+        branch = re.fullmatch(r"/repos/([^/]+/[^/]+)/branches/(.+)", path)
+        if method == "GET" and branch:
+            return self._branch(*branch.groups(), rate_headers)
+        if method == "GET" and path == "/user/repos":
+            repos = [public(r) for _, r in sorted(self.fake.repos.items())]
+            return self._page(repos, params, rate_headers, "GET /user/repos")
+        if method == "GET" and path == "/user/orgs":
+            orgs = sorted({r["owner"]["login"] for r in self.fake.repos.values()} - {self.fake.config.user})
+            return self._page([{"login": org} for org in orgs], params, rate_headers, "GET /user/orgs")
+        if method == "GET" and path == "/search/issues":
+            items = self.fake.search(params.get("q", ""))
+            return self._search(items, params, rate_headers)
+        if m:
+            repo, pulls, number, merge = m.groups()
+            return self._repo(method, repo, bool(pulls), number, bool(merge), params, rate_headers)
+        return self._send(404, {"message": "Not Found"}, rate_headers, endpoint="other")
+
+    def _branch(self, repo, name, rate_headers):
+        if repo not in self.fake.repos or name != "main":
+            return self._send(404, {"message": "Branch not found"}, rate_headers, endpoint="other")
+        with self.fake.lock:
+            tip = self.fake.branch_tips.get(repo) or hashlib.sha1(f"{repo}:base".encode()).hexdigest()
+        return self._send(200, {"name": name, "commit": {"sha": tip}}, rate_headers,
+                          endpoint="GET /repos/{repo}/branches/{branch}")
+
+    def _repo(self, method, repo, pulls_path, number, merge, params, rate_headers):
+        if repo not in self.fake.repos:
+            return self._send(404, {"message": "Not Found"}, rate_headers, endpoint="other")
+        if not pulls_path:
+            return self._send(200, public(self.fake.repos[repo]), rate_headers, endpoint="GET /repos/{repo}")
+        pulls = self.fake.pulls[repo]
+        if number is None:
+            open_pulls = [public(p) for p in pulls if p["state"] == "open"]
+            return self._page(open_pulls, params, rate_headers, "GET /repos/{repo}/pulls")
+
+        pull = next((p for p in pulls if p["number"] == int(number)), None)
+        if pull is None:
+            return self._send(404, {"message": "Not Found"}, rate_headers, endpoint="other")
+        if not merge and method == "GET":
+            detail = public(pull)
+            detail["merged"] = pull.get("_merged", False)
+            with self.fake.lock:
+                if pull["_pending_polls"] > 0:
+                    pull["_pending_polls"] -= 1
+                    detail.update(mergeable=None, mergeable_state="unknown")
+                else:
+                    mergeable = not pull["_conflict"] and pull["state"] == "open"
+                    detail.update(mergeable=mergeable, mergeable_state="clean" if mergeable else "dirty")
+            return self._send(200, detail, rate_headers, endpoint="GET /repos/{repo}/pulls/{number}")
+        if merge and method == "PUT":
+            with self.fake.lock:
+                if pull["_conflict"] or pull["state"] != "open":
+                    status, payload = 405, {"message": "Pull Request is not mergeable"}
+                else:
+                    pull["state"] = "closed"
+                    pull["_merged"] = True
+                    self.fake.branch_tips[repo] = hashlib.sha1(f"{repo}#{number}:merge".encode()).hexdigest()
+                    status, payload = 200, {"merged": True, "message": "Pull Request successfully merged"}
+            return self._send(status, payload, rate_headers, endpoint="PUT /repos/{repo}/pulls/{number}/merge")
+        return self._send(404, {"message": "Not Found"}, rate_headers, endpoint="other")
+
+    def _links(self, params, page, last):
+        links = []
+        for rel, target in (("next", page + 1), ("last", last)):
+            if rel == "next" and page >= last:
+                continue
+            query = urlencode({**params, "page": target})
+            links.append(f'<http://{self.headers["Host"]}{urlsplit(self.path).path}?{query}>; rel="{rel}"')
+        return ", ".join(links)
+
+    def _page(self, items, params, rate_headers, endpoint):
+        per_page = min(int(params.get("per_page", 30)), 100)
+        page = int(params.get("page", 1))
+        last = max(1, -(-len(items) // per_page))
+        chunk = items[(page - 1) * per_page:page * per_page]
+        headers = dict(rate_headers)
+        link = self._links(params, page, last)
+        if link:
+            headers["Link"] = link
+        return self._send(200, chunk, headers, endpoint=endpoint)
+
+    def _search(self, items, params, rate_headers):
+        per_page = min(int(params.get("per_page", 30)), 100)
+        page = int(params.get("page", 1))
+        if (page - 1) * per_page >= SEARCH_CAP:
+            return self._send(422, {"message": "Only the first 1000 search results are available"},
+                              rate_headers, endpoint="GET /search/issues")
+        capped = items[:SEARCH_CAP]
+        last = max(1, -(-len(capped) // per_page))
+        chunk = [public(i) for i in capped[(page - 1) * per_page:page * per_page]]
+        headers = dict(rate_headers)
+        link = self._links(params, page, last)
+        if link:
+            headers["Link"] = link
+        payload = {"total_count": len(items), "incomplete_results": False, "items": chunk}
+        return self._send(200, payload, headers, endpoint="GET /search/issues")
+
+    def _send(self, status, payload, headers=None, endpoint=None, count=True):
+        data = json.dumps(payload).encode("utf-8")
+        etag = f'"{hashlib.sha1(data).hexdigest()}"'
+        if status == 200 and count and self.headers.get("If-None-Match") == etag:
+            status, data = 304, b""
+            self.fake.refund_token(self._resource)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if status in (200, 304) and count:
+            self.send_header("ETag", etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        if count:
+            self.fake.record(endpoint or "other", len(data), status)
+
+
+def start_server(config, port=0):
+    """
+    Start a fake API server in a background thread.
+
+    Args:
+        config (FakeConfig): Dataset and injection settings.
+        port (int): Port to listen on; 0 picks a free one.
+
+    Returns:
+        ThreadingHTTPServer: The running server; its .fake attribute holds
+        the dataset and counters, .base_url the API root.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeGitHubHandler)
+    server.daemon_threads = True
+    server.fake = FakeGitHub(config)
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_config_arguments(parser):
+    defaults = FakeConfig()
+    parser.add_argument("--user", default=defaults.user, help="Login of the synthetic account")
+    parser.add_argument("--repos", type=int, default=defaults.repos)
+    parser.add_argument("--prs-per-repo", type=int, default=defaults.prs_per_repo)
+    parser.add_argument("--issues", type=int, default=defaults.issues)
+    parser.add_argument("--conflict-rate", type=float, default=defaults.conflict_rate)
+    parser.add_argument("--pending-rate", type=float, default=defaults.pending_rate,
+                        help="Share of PRs whose first mergeability check returns null")
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument("--jitter-ms", type=float, default=defaults.jitter_ms)
+    parser.add_argument("--core-limit", type=int, default=defaults.core_limit)
+    parser.add_argument("--search-limit", type=int, default=defaults.search_limit)
+    parser.add_argument("--rate-window", type=int, default=defaults.rate_window,
+                        help="Seconds after which rate-limit buckets refill")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args):
+    return FakeConfig(
+        user=args.user,
+        repos=args.repos,
+        prs_per_repo=args.prs_per_repo,
+        issues=args.issues,
+        conflict_rate=args.conflict_rate,
+        pending_rate=args.pending_rate,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        core_limit=args.core_limit,
+        search_limit=args.search_limit,
+        rate_window=args.rate_window,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake GitHub API server for benchmarks")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_server(config_from_args(args), args.port)
+    print(f"🧪 Fake GitHub API for '{args.user}' listening on {server.base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
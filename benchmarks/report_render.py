@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTML report rendering.
+
+Compares the previous string-concatenation rendering (inline styles on
+every element) with report_utils.ReportBuilder for synthetic issue
+reports, and prints render time and email size.
+
+Usage:
+    python benchmarks/report_render.py [--items 1000 10000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts", "github"))
+
+from report_utils import ReportBuilder, escape  # noqa: E402
+
+
+def synthetic_issues(count):
+    return [
+        {
+            "number": i,
+            "title": f"Bump dependency-{i % 97} from 1.{i % 13}.0 to 1.{i % 13 + 1}.0",
+            "html_url": f"https://github.com/octocat/repo-{i % 50}/issues/{i}",
+            "repository_url": f"https://api.github.com/repos/octocat/repo-{i % 50}",
+            "user": {"login": "dependabot[bot]"},
+            "labels": [{"name": "dependencies"}, {"name": "python"}],
+            "comments": i % 7,
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_render(issues):
+    """The rendering used before ReportBuilder: html += f'...' with inline styles."""
+    html = f"""
+    <h3 style="border-bottom: 1px solid #eee; padding-bottom: 4px;">Created by you ({len(issues)})</h3>
+    """
+    html += "<ul style='padding-left: 20px;'>"
+    for issue in issues:
+        repo = issue['repository_url'].split('/')[-1]
+        labels = ", ".join(label["name"] for label in issue["labels"])
+        html += f"""
+        <li style="margin-bottom: 12px;">
+          <a href="{issue['html_url']}" style="color: #0366d6; text-decoration: none;">
+            #{issue['number']} {issue['title']}
+          </a>
+          <div style="font-size: 12px; color: #555;">
+            in <strong>{repo}</strong> by <em>{issue['user']['login']}</em><br/>
+            Labels: <em>{labels}</em> | Comments: <strong>{issue['comments']}</strong>
+          </div>
+        </li>
+        """
+    html += "</ul>"
+    return html
+
+
+def builder_render(issues):
+    report = ReportBuilder(title="GitHub Issue Report", github_user="octocat")
+    report.section("Created by you", len(issues))
+    report.begin_list()
+    for issue in issues:
+        repo = issue['repository_url'].split('/')[-1]
+        labels = ", ".join(label["name"] for label in issue["labels"])
+        meta = (
+            f"in <strong>{escape(repo)}</strong> by <em>{escape(issue['user']['login'])}</em><br/>"
+            f"Labels: <em>{escape(labels)}</em> | Comments: <strong>{issue['comments']}</strong>"
+        )
+        report.item(issue['html_url'], f"#{issue['number']} {issue['title']}", meta_html=meta)
+    report.end_list()
+    return report.finish()
+
+
+def measure(render, issues, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = render(issues)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(output.encode("utf-8"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML report rendering")
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'renderer':<10} {'best ms':>10} {'bytes':>12}")
+    for count in args.items:
+        issues = synthetic_issues(count)
+        for name, render in (("legacy", legacy_render), ("builder", builder_render)):
+            seconds, size = measure(render, issues, args.repeat)
+            print(f"{count:>8} {name:<10} {seconds * 1000:>10.2f} {size:>12,}")
+
+
+if __name__ == "__main__":
+    main()
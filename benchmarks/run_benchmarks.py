@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end script runs against the fake GitHub API.
+
+Starts benchmarks/fake_github.py in-process, runs auto_merge_prs,
+report_open_prs and report_open_issues against it and records wall time,
+API requests and response bytes per script. Each script is run cold
+(empty response cache and state) and, with --warm, a second time reusing
+the cache and state of the first run.
+
+Results can be saved with --output and compared against an earlier run
+with --baseline, which makes them a regression baseline for performance
+changes.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--repos 200] [--issues 5000] [--latency-ms 30]
+        [--warm] [--output results.json] [--baseline results.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import fake_github
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SCRIPTS_DIR = os.path.join(ROOT, "scripts", "github")
+SCRIPTS = ["auto_merge_prs", "report_open_prs", "report_open_issues"]
+SCRIPT_TIMEOUT = 900
+# Never let a benchmark run send real notifications
+STRIPPED_ENV_PREFIXES = ("SMTP_", "EMAIL_", "TELEGRAM_", "GITHUB_", "AUTO_MERGE_", "REPORT_", "NOTIFY_")
+
+
+def fake_api(server, method, path):
+    request = urllib.request.Request(f"{server.base_url}{path}", method=method)
+    with urllib.request.urlopen(request) as response:
+        return json.load(response)
+
+
+def script_env(server, workdir):
+    env = {k: v for k, v in os.environ.items() if not k.startswith(STRIPPED_ENV_PREFIXES)}
+    env.update({
+        "GITHUB_API_URL": server.base_url,
+        "GITHUB_TOKEN": "benchmark-token",
+        "GITHUB_USER": server.fake.config.user,
+        "GITHUB_CACHE_DIR": os.path.join(workdir, "http-cache"),
+        "AUTO_MERGE_STATE_FILE": os.path.join(workdir, "auto_merge_state.json"),
+        "AUTO_MERGE_REPOS_CACHE": os.path.join(workdir, "repos.json"),
+        "NOTIFY_OUTBOX_DIR": os.path.join(workdir, "outbox"),
+        "PYTHONUNBUFFERED": "1",
+    })
+    return env
+
+
+def run_script(server, script, args, workdir, log_path):
+    """
+    Run one script against a freshly reset fake API.
+
+    Returns:
+        dict: {wall, returncode, requests, bytes, not_modified, rate_limited, endpoints}.
+    """
+    fake_api(server, "PUT", "/_reset")
+    started = time.perf_counter()
+    with open(log_path, "w") as log_file:
+        try:
+            result = subprocess.run(
+                [sys.executable, os.path.join(SCRIPTS_DIR, f"{script}.py"), *args],
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                env=script_env(server, workdir),
+                timeout=SCRIPT_TIMEOUT,
+            )
+            returncode = result.returncode
+        except subprocess.TimeoutExpired:
+            returncode = "timeout"
+    wall = time.perf_counter() - started
+    stats = fake_api(server, "GET", "/_stats")
+    return {
+        "wall": round(wall, 3),
+        "returncode": returncode,
+        "requests": stats["requests"],
+        "bytes": stats["bytes"],
+        "not_modified": stats["not_modified"],
+        "rate_limited": stats["rate_limited"],
+        "endpoints": stats["endpoints"],
+    }
+
+
+def delta(current, previous):
+    if not previous:
+        return ""
+    return f"{(current - previous) / previous * 100:+.0f}%"
+
+
+def print_results(results, baseline=None):
+    baseline_runs = {(r["script"], r["run"]): r for r in (baseline or {}).get("runs", [])}
+    print(f"\n{'script':<20} {'run':<5} {'wall s':>8} {'':>6} {'requests':>9} {'':>6} {'KiB':>9} {'':>6} {'304':>5} {'429/403':>7}")
+    for run in results["runs"]:
+        previous = baseline_runs.get((run["script"], run["run"]), {})
+        status = "" if run["returncode"] == 0 else f"  ❌ exit {run['returncode']}"
+        print(
+            f"{run['script']:<20} {run['run']:<5} {run['wall']:>8.2f} {delta(run['wall'], previous.get('wall')):>6} "
+            f"{run['requests']:>9} {delta(run['requests'], previous.get('requests')):>6} "
+            f"{run['bytes'] / 1024:>9.1f} {delta(run['bytes'], previous.get('bytes')):>6} "
+            f"{run['not_modified']:>5} {run['rate_limited']:>7}{status}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scripts against a fake GitHub API")
+    fake_github.add_config_arguments(parser)
+    parser.add_argument("--scripts", nargs="+", choices=SCRIPTS, default=SCRIPTS)
+    parser.add_argument("--backend", default="rest", choices=["rest", "search"],
+                        help="PR discovery backend for auto_merge_prs (the fake API has no GraphQL)")
+    parser.add_argument("--warm", action="store_true", help="Also run each script again with a warm cache")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against results saved earlier with --output")
+    parser.add_argument("--logs", help="Keep script output in this directory")
+    args = parser.parse_args()
+
+    config = fake_github.config_from_args(args)
+    server = fake_github.start_server(config)
+    print(f"🧪 Fake GitHub API on {server.base_url}: {config.repos} repos, "
+          f"{config.prs_per_repo} PRs/repo, {config.issues} issues, {config.latency_ms:.0f}ms latency")
+
+    script_args = {"auto_merge_prs": ["--backend", args.backend]}
+    results = {"config": vars(config), "backend": args.backend, "runs": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = args.logs or tmp
+        os.makedirs(log_dir, exist_ok=True)
+        for script in args.scripts:
+            workdir = os.path.join(tmp, script)
+            os.makedirs(workdir)
+            for run in ["cold", "warm"] if args.warm else ["cold"]:
+                print(f"▶️ {script} ({run})")
+                log_path = os.path.join(log_dir, f"{script}_{run}.log")
+                result = run_script(server, script, script_args.get(script, []), workdir, log_path)
+                results["runs"].append({"script": script, "run": run, **result})
+                if result["returncode"] != 0:
+                    print(f"❌ {script} failed, see {log_path}" if args.logs else f"❌ {script} failed")
+    server.shutdown()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,7 +28,7 @@ EOF
 
 # Dump selected environment variables with quoting
 {
-  printenv | grep -E '^(WEB_PORT|GITHUB_TOKEN|GITHUB_USER|MERGE_METHOD|PRINTER_URI|PRINTER_NAME|SMTP_USER|SMTP_PWD|SMTP_SERVER|SMTP_PORT|EMAIL_FROM|EMAIL_TO|TELEGRAM_BOT_ID|TELEGRAM_CHAT_ID)=' | \
+  printenv | grep -E '^(WEB_PORT|GITHUB_[A-Z_]+|MERGE_METHOD|PRINTER_URI|PRINTER_NAME|SMTP_USER|SMTP_PWD|SMTP_SERVER|SMTP_PORT|EMAIL_FROM|EMAIL_TO|TELEGRAM_[A-Z_]+|NOTIFY_[A-Z_]+|LOG_[A-Z_]+|AUTO_MERGE_[A-Z_]+|REPORT_PRS_MODE|ISSUE_SEARCH_WORKERS|RUN_HISTORY_DB)=' | \
     while IFS='=' read -r key value; do
       echo "export ${key}=\"${value//\"/\\\"}\""
     done
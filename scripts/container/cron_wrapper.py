@@ -1,15 +1,35 @@
-import json
 import datetime
 import subprocess
-import fcntl
 import sys
 import os
 
+import log_retention
+import run_history
+
 LOG_DIR = "/var/log/github-scripts"
-HISTORY_FILE = os.path.join(LOG_DIR, "script_run_history.json")
 os.makedirs(LOG_DIR, exist_ok=True)
 
-def append_run_history(script_name, status, start_time, end_time, duration_seconds, log_filename):
+def start_outbox_flush(script_path, log_path):
+    """
+    Deliver the notifications the script queued, in a detached process so
+    neither the script nor this wrapper waits on SMTP or Telegram.
+    """
+    notify_utils = os.path.join(os.path.dirname(os.path.abspath(script_path)), "notify_utils.py")
+    if not os.path.exists(notify_utils):
+        return
+    try:
+        with open(log_path, "a") as log_file:
+            subprocess.Popen(
+                [sys.executable, notify_utils, "--flush"],
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+                env=os.environ.copy()
+            )
+    except Exception as e:
+        print(f"Failed to start outbox flush: {e}")
+
+def append_run_history(script_name, status, start_time, end_time, duration_seconds, log_filename, metrics=None):
     record = {
         "script": script_name,
         "start": start_time,
@@ -18,21 +38,14 @@ def append_run_history(script_name, status, start_time, end_time, duration_secon
         "status": status,
         "log_file": log_filename
     }
+    if metrics:
+        record["metrics"] = metrics
     try:
-        if not os.path.exists(HISTORY_FILE):
-            with open(HISTORY_FILE, "w") as f:
-                f.write("[]")
-        with open(HISTORY_FILE, "r+") as f:
-            fcntl.flock(f, fcntl.LOCK_EX)
-            try:
-                data = json.load(f)
-            except json.JSONDecodeError:
-                data = []
-            data.append(record)
-            f.seek(0)
-            json.dump(data, f, indent=2)
-            f.truncate()
-            fcntl.flock(f, fcntl.LOCK_UN)
+        conn = run_history.connect()
+        try:
+            run_history.append_run(conn, record)
+        finally:
+            conn.close()
     except Exception as e:
         print(f"Failed to update run history: {e}")
 
@@ -44,10 +57,19 @@ if __name__ == "__main__":
     script_name = sys.argv[1]
     script_path = sys.argv[2]
 
+    # Compress and prune earlier logs before this run starts writing its own
+    try:
+        log_retention.apply_retention(LOG_DIR)
+    except Exception as e:
+        print(f"Failed to apply log retention: {e}")
+
     start_dt = datetime.datetime.now()
     start_time = start_dt.strftime('%Y-%m-%d_%H-%M-%S')
     log_filename = f"{script_name}_{start_time}.log"
     log_path = os.path.join(LOG_DIR, log_filename)
+    metrics_path = os.path.join(LOG_DIR, f".{script_name}_{start_time}.metrics.json")
+    env = os.environ.copy()
+    env["GITHUB_METRICS_FILE"] = metrics_path
     status = "error"
 
     try:
@@ -58,7 +80,7 @@ if __name__ == "__main__":
                 stderr=subprocess.STDOUT,
                 text=True,
                 bufsize=1,
-                env=os.environ.copy()
+                env=env
             )
             if result.returncode == 0:
                 status = "success"
@@ -69,4 +91,6 @@ if __name__ == "__main__":
     end_time = datetime.datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
     end_dt = datetime.datetime.now()
     duration_seconds = (end_dt - start_dt).total_seconds()
-    append_run_history(script_name, status, start_time, end_time, duration_seconds, log_filename)
+    metrics = run_history.read_run_metrics(metrics_path)
+    append_run_history(script_name, status, start_time, end_time, duration_seconds, log_filename, metrics)
+    start_outbox_flush(script_path, log_path)
@@ -1,9 +1,9 @@
 #!/bin/bash
 
-# Check if Flask web interface is up
+# Check if Flask web interface is up and its background tasks are running
 WEB_PORT="${WEB_PORT:-80}"
-if ! curl -sf http://localhost:$WEB_PORT >/dev/null; then
-  echo "Flask not responding on port $WEB_PORT"
+if ! curl -sf --max-time 5 http://localhost:$WEB_PORT/ready >/dev/null; then
+  echo "Flask not ready on port $WEB_PORT"
   exit 1
 fi
 
@@ -0,0 +1,201 @@
+import gzip
+import os
+import re
+import shutil
+import sys
+import time
+
+import run_history
+
+LOG_DIR = "/var/log/github-scripts"
+
+
+# === Retention Config ===
+try:
+    # Delete run logs older than this
+    RETENTION_DAYS = float(os.getenv("LOG_RETENTION_DAYS", 30))
+except ValueError:
+    print("⚠️ Invalid LOG_RETENTION_DAYS, using default 30")
+    RETENTION_DAYS = 30
+try:
+    # Gzip run logs older than this
+    COMPRESS_AFTER_DAYS = float(os.getenv("LOG_COMPRESS_AFTER_DAYS", 1))
+except ValueError:
+    print("⚠️ Invalid LOG_COMPRESS_AFTER_DAYS, using default 1")
+    COMPRESS_AFTER_DAYS = 1
+try:
+    # Size cap for all run logs together; the oldest go first
+    MAX_TOTAL_BYTES = int(float(os.getenv("LOG_MAX_TOTAL_MB", 500)) * 1024 * 1024)
+except ValueError:
+    print("⚠️ Invalid LOG_MAX_TOTAL_MB, using default 500")
+    MAX_TOTAL_BYTES = 500 * 1024 * 1024
+try:
+    # Rotate *_cron.log files above this size
+    APPEND_LOG_MAX_BYTES = int(float(os.getenv("LOG_APPEND_MAX_MB", 10)) * 1024 * 1024)
+except ValueError:
+    print("⚠️ Invalid LOG_APPEND_MAX_MB, using default 10")
+    APPEND_LOG_MAX_BYTES = 10 * 1024 * 1024
+try:
+    # Rotated *_cron.log.N.gz files to keep
+    APPEND_LOG_KEEP = int(os.getenv("LOG_APPEND_KEEP", 3))
+except ValueError:
+    print("⚠️ Invalid LOG_APPEND_KEEP, using default 3")
+    APPEND_LOG_KEEP = 3
+
+# <script>_<YYYY-mm-dd_HH-MM-SS>.log, optionally compressed
+RUN_LOG_PATTERN = re.compile(r"^.+_\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}\.log(\.gz)?$")
+APPEND_LOG_SUFFIX = "_cron.log"
+
+
+def open_log(path):
+    """
+    Open a run log for reading as text, whether or not it has been compressed.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", errors="replace")
+    return open(path, "r", errors="replace")
+
+
+def resolve_log_path(log_dir, log_filename):
+    """
+    Map a log file name from run history to the file on disk, following
+    compaction ('x.log' -> 'x.log.gz').
+
+    Returns:
+        str or None: Path of the existing file, or None.
+    """
+    path = os.path.join(log_dir, os.path.basename(log_filename))
+    for candidate in (path, f"{path}.gz"):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def _gzip_file(path, target):
+    tmp_path = f"{target}.tmp"
+    with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    shutil.copystat(path, tmp_path)
+    os.replace(tmp_path, target)
+    os.remove(path)
+
+
+def _run_logs(log_dir):
+    with os.scandir(log_dir) as entries:
+        return [
+            (entry.stat().st_mtime, entry.stat().st_size, entry.name)
+            for entry in entries
+            if entry.is_file() and RUN_LOG_PATTERN.match(entry.name)
+        ]
+
+
+def compress_run_logs(conn, log_dir=LOG_DIR, older_than_days=COMPRESS_AFTER_DAYS):
+    """
+    Gzip run logs older than a number of days and point their history
+    records at the compressed file.
+
+    Returns:
+        int: Number of logs compressed.
+    """
+    cutoff = time.time() - older_than_days * 86400
+    count = 0
+    for mtime, _, name in _run_logs(log_dir):
+        if name.endswith(".gz") or mtime > cutoff:
+            continue
+        try:
+            _gzip_file(os.path.join(log_dir, name), os.path.join(log_dir, f"{name}.gz"))
+        except OSError as e:
+            print(f"⚠️ Failed to compress {name}: {e}")
+            continue
+        conn.execute("UPDATE runs SET log_file = ? WHERE log_file = ?", (f"{name}.gz", name))
+        count += 1
+    return count
+
+
+def prune_run_logs(conn, log_dir=LOG_DIR, max_age_days=RETENTION_DAYS, max_total_bytes=MAX_TOTAL_BYTES):
+    """
+    Delete run logs older than max_age_days, then the oldest remaining
+    ones until all run logs fit into max_total_bytes. History records are
+    kept but no longer reference a log file.
+
+    Returns:
+        int: Number of logs deleted.
+    """
+    cutoff = time.time() - max_age_days * 86400
+    logs = sorted(_run_logs(log_dir))
+    total = sum(size for _, size, _ in logs)
+    count = 0
+    for mtime, size, name in logs:
+        if mtime > cutoff and total <= max_total_bytes:
+            break
+        try:
+            os.remove(os.path.join(log_dir, name))
+        except FileNotFoundError:
+            pass
+        total -= size
+        conn.execute("UPDATE runs SET log_file = NULL WHERE log_file = ?", (name,))
+        count += 1
+    return count
+
+
+def rotate_append_logs(log_dir=LOG_DIR, max_bytes=APPEND_LOG_MAX_BYTES, keep=APPEND_LOG_KEEP):
+    """
+    Rotate the *_cron.log files that cron appends to once they exceed
+    max_bytes: the content is compressed to 'x_cron.log.1.gz', older
+    rotations shift up and anything beyond 'keep' is removed.
+
+    The file is copied and then truncated in place rather than renamed,
+    because a running cron job may still hold it open for appending.
+
+    Returns:
+        int: Number of files rotated.
+    """
+    count = 0
+    for name in os.listdir(log_dir):
+        path = os.path.join(log_dir, name)
+        if not name.endswith(APPEND_LOG_SUFFIX) or os.path.getsize(path) <= max_bytes:
+            continue
+        oldest = f"{path}.{keep}.gz"
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for n in range(keep - 1, 0, -1):
+            if os.path.exists(f"{path}.{n}.gz"):
+                os.replace(f"{path}.{n}.gz", f"{path}.{n + 1}.gz")
+        if keep > 0:
+            target = f"{path}.1.gz"
+            with open(path, "rb") as src, gzip.open(f"{target}.tmp", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(f"{target}.tmp", target)
+        os.truncate(path, 0)
+        count += 1
+    return count
+
+
+def apply_retention(log_dir=LOG_DIR):
+    """
+    Run all retention policies on the log directory.
+
+    Returns:
+        dict: Counts of 'compressed', 'deleted' and 'rotated' files.
+    """
+    conn = run_history.connect()
+    try:
+        # Prune first so no time is spent compressing logs that are about to go
+        deleted = prune_run_logs(conn, log_dir)
+        result = {
+            "compressed": compress_run_logs(conn, log_dir),
+            "deleted": deleted,
+            "rotated": rotate_append_logs(log_dir),
+        }
+    finally:
+        conn.close()
+    if any(result.values()):
+        print(
+            f"🧹 Log retention: {result['compressed']} compressed, "
+            f"{result['deleted']} deleted, {result['rotated']} rotated"
+        )
+    return result
+
+
+if __name__ == "__main__":
+    apply_retention(sys.argv[1] if len(sys.argv) > 1 else LOG_DIR)
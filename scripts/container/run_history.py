@@ -0,0 +1,171 @@
+import json
+import os
+import sqlite3
+
+LOG_DIR = "/var/log/github-scripts"
+HISTORY_DB = os.getenv("RUN_HISTORY_DB", os.path.join(LOG_DIR, "script_run_history.db"))
+# Pre-SQLite history, imported once and then renamed to *.migrated
+LEGACY_HISTORY_FILE = os.path.join(LOG_DIR, "script_run_history.json")
+
+COLUMNS = ("script", "start", "end", "duration", "status", "log_file")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    script TEXT NOT NULL,
+    start TEXT NOT NULL,
+    "end" TEXT,
+    duration REAL,
+    status TEXT,
+    log_file TEXT,
+    metrics TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_start ON runs (start);
+CREATE INDEX IF NOT EXISTS idx_runs_script_start ON runs (script, start);
+"""
+
+
+def connect(db_path=None):
+    """
+    Open the run-history database, creating it and importing the legacy
+    JSON history on first use.
+
+    Start times are stored as '%Y-%m-%d_%H-%M-%S' strings, which sort
+    chronologically, so paging is an index scan on 'start'.
+
+    Returns:
+        sqlite3.Connection: Connection with rows accessible by column name.
+    """
+    db_path = db_path or HISTORY_DB
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    # Autocommit mode; writes are single statements or explicit transactions
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # WAL lets the dashboard read while cron appends
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    migrate_legacy_history(conn)
+    return conn
+
+
+def migrate_legacy_history(conn, json_path=None):
+    """
+    Import records from the old JSON history file, once.
+
+    The import runs in a single transaction and the file is renamed to
+    '<name>.migrated' afterwards, so concurrent processes never import it twice.
+    """
+    json_path = json_path or LEGACY_HISTORY_FILE
+    if not os.path.exists(json_path):
+        return 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if not os.path.exists(json_path):
+            conn.execute("ROLLBACK")
+            return 0
+        try:
+            with open(json_path, "r") as f:
+                records = json.load(f)
+        except json.JSONDecodeError:
+            records = []
+        conn.executemany(
+            'INSERT INTO runs (script, start, "end", duration, status, log_file, metrics) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            [_row(record) for record in records if record.get("script") and record.get("start")],
+        )
+        os.replace(json_path, f"{json_path}.migrated")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    print(f"Migrated {len(records)} run history records from {json_path}")
+    return len(records)
+
+
+def _row(record):
+    metrics = record.get("metrics")
+    return tuple(record.get(column) for column in COLUMNS) + (json.dumps(metrics) if metrics else None,)
+
+
+def _record(row, include_metrics=False):
+    record = {column: row[column] for column in COLUMNS}
+    if include_metrics:
+        record["metrics"] = json.loads(row["metrics"]) if row["metrics"] else None
+    return record
+
+
+def append_run(conn, record):
+    """
+    Append one run record (a single atomic INSERT).
+
+    Args:
+        conn (sqlite3.Connection): Connection from connect().
+        record (dict): {script, start, end, duration, status, log_file, metrics?}.
+    """
+    conn.execute(
+        'INSERT INTO runs (script, start, "end", duration, status, log_file, metrics) VALUES (?, ?, ?, ?, ?, ?, ?)',
+        _row(record),
+    )
+
+
+def read_run_metrics(metrics_path):
+    """
+    Load the API metrics a script wrote at exit (see github_client), if any,
+    and remove the file.
+
+    Returns:
+        dict or None: The metrics, or None if the script wrote none.
+    """
+    try:
+        with open(metrics_path, "r") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    finally:
+        if os.path.exists(metrics_path):
+            os.remove(metrics_path)
+
+
+def list_runs(conn, page=1, per_page=10):
+    """
+    Return one page of runs, newest first.
+
+    Returns:
+        tuple[list[dict], int]: The records on the page and the total number of runs.
+    """
+    total = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+    rows = conn.execute(
+        'SELECT script, start, "end", duration, status, log_file FROM runs '
+        "ORDER BY start DESC, id DESC LIMIT ? OFFSET ?",
+        (per_page, (page - 1) * per_page),
+    ).fetchall()
+    return [_record(row) for row in rows], total
+
+
+def latest_runs(conn):
+    """
+    Return the most recent run of every script, including its metrics.
+    """
+    rows = conn.execute(
+        'SELECT script, start, "end", duration, status, log_file, metrics FROM runs WHERE id IN ('
+        "SELECT (SELECT id FROM runs WHERE script = s.script ORDER BY start DESC, id DESC LIMIT 1) "
+        "FROM (SELECT DISTINCT script FROM runs) s)"
+    ).fetchall()
+    return [_record(row, include_metrics=True) for row in rows]
+
+
+def run_counts(conn):
+    """
+    Returns:
+        dict[tuple[str, str], int]: (script, status) -> number of runs.
+    """
+    rows = conn.execute("SELECT script, status, COUNT(*) FROM runs GROUP BY script, status").fetchall()
+    return {(row[0], row[1]): row[2] for row in rows}
+
+
+def log_files(conn):
+    return [row[0] for row in conn.execute("SELECT log_file FROM runs WHERE log_file IS NOT NULL")]
+
+
+def clear(conn):
+    conn.execute("DELETE FROM runs")
@@ -1,13 +1,22 @@
+import gzip
+import hashlib
 import json
+import mmap
 import os
 import re
+import struct
 import subprocess
 import sys
 import threading
+import time
+from collections import deque
 from datetime import datetime
 
-from flask import Flask, jsonify, render_template_string, request, send_file
-from flask_socketio import SocketIO
+from flask import Flask, Response, jsonify, render_template, request, send_file
+from flask_socketio import SocketIO, join_room, leave_room
+
+import log_retention
+import run_history
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "default-secret")
@@ -53,6 +62,27 @@ def read_version():
         return "Unknown"
 
 SCRIPTS_FILE = "/home/scripts/scripts.json"
+NOTIFY_UTILS = "/home/scripts/notify_utils.py"
+OUTBOX_DIR = os.environ.get("NOTIFY_OUTBOX_DIR", "/var/log/github-scripts/outbox")
+try:
+    OUTBOX_FLUSH_INTERVAL = int(os.environ.get("NOTIFY_FLUSH_INTERVAL", 300))
+except ValueError:
+    OUTBOX_FLUSH_INTERVAL = 300
+try:
+    # Live output is sent in batches, flushed after this many seconds...
+    LOG_BATCH_INTERVAL = float(os.environ.get("LOG_BATCH_INTERVAL", 0.25))
+except ValueError:
+    LOG_BATCH_INTERVAL = 0.25
+try:
+    # ...or as soon as this many lines are waiting
+    LOG_BATCH_MAX_LINES = int(os.environ.get("LOG_BATCH_MAX_LINES", 200))
+except ValueError:
+    LOG_BATCH_MAX_LINES = 200
+try:
+    # Lines of live output kept in memory per script; the full output is in the run log
+    LOG_LIVE_LINES = int(os.environ.get("LOG_LIVE_LINES", 1000))
+except ValueError:
+    LOG_LIVE_LINES = 1000
 
 def load_scripts():
     try:
@@ -65,20 +95,385 @@ def load_scripts():
 SCRIPTS = load_scripts()
 
 execution_status = {name: None for name in SCRIPTS.keys()}
-execution_logs = {name: [] for name in SCRIPTS.keys()}
+execution_logs = {name: deque(maxlen=LOG_LIVE_LINES) for name in SCRIPTS.keys()}
 script_threads = {}
-run_history = []
+# Lines read but not yet sent to the script's Socket.IO room
+pending_log_lines = {name: [] for name in SCRIPTS.keys()}
+# Run log of the current run, written as output arrives
+live_log_files = {}
+log_batch_lock = threading.Lock()
 LOG_DIR = "/var/log/github-scripts"
-HISTORY_FILE = f"{LOG_DIR}/script_run_history.json"
 os.makedirs(LOG_DIR, exist_ok=True)
 
-# Load existing run history from file if it exists
-if os.path.exists(HISTORY_FILE):
-    with open(HISTORY_FILE, "r") as f:
-        try:
-            run_history = json.load(f)
-        except json.JSONDecodeError:
-            run_history = []
+# Run history lives in SQLite (see run_history.py), shared with cron_wrapper
+history_db = run_history.connect()
+history_lock = threading.Lock()
+
+# Static parts of the dashboard, served with ETag and Cache-Control from /assets
+DASHBOARD_CSS = """
+body {
+    padding: 2rem;
+    background: #f8f9fa;
+    display: flex;
+    flex-direction: column;
+    min-height: 100vh;
+    margin: 0;
+}
+.container {
+    flex: 1;
+}
+.card { margin-bottom: 1rem; }
+
+.output pre {
+    background: #212529;
+    color: #f8f9fa;
+    padding: 1rem;
+    border-radius: 0.5rem;
+    white-space: pre-wrap;
+    word-break: break-word;
+    max-height: 300px;
+    overflow-y: auto;
+}
+
+#log-content {
+    white-space: pre-wrap;
+    word-break: break-word;
+    max-height: 70vh;
+    overflow-y: auto;
+}
+
+.status-running { color: #0d6efd; font-weight: bold; }
+.status-success { color: #198754; font-weight: bold; }
+.status-error { color: #dc3545; font-weight: bold; }
+
+#toast-container {
+    position: fixed;
+    top: 1rem;
+    right: 1rem;
+    z-index: 9999;
+}
+
+.footer {
+    background: #e9ecef;
+    text-align: center;
+    padding: 0.75rem;
+    font-size: 0.85rem;
+    color: #6c757d;
+    border-top: 1px solid #dee2e6;
+}
+
+.header-title img {
+    vertical-align: middle;
+    margin-right: 0.5rem;
+}
+
+.run-history-row:hover {
+    cursor: pointer;
+}
+"""
+
+DASHBOARD_JS = """
+const socket = io({
+    reconnection: true,
+    reconnectionAttempts: 10,      // try 10 times
+    reconnectionDelay: 1000,       // wait 1 second before trying to reconnect
+    reconnectionDelayMax: 5000,    // max 5 seconds delay between attempts
+    timeout: 20000,                // connection timeout
+});
+const wsStatus = document.getElementById("ws-status");
+
+function setWsStatus(state, color) {
+    wsStatus.textContent = "WebSocket: " + state;
+    wsStatus.className = "badge bg-" + color;
+}
+
+socket.on("connect", () => {
+    console.log("✅ Socket.IO connected");
+    setWsStatus("Connected", "success");
+    // 🔥 Remove the disconnect toast if it exists
+    const lostToast = document.getElementById("ws-disconnect-toast");
+    if (lostToast) lostToast.remove();            
+});
+
+socket.on("disconnect", (reason) => {
+    console.warn("⚠️ Socket.IO disconnected:", reason);
+    setWsStatus("Disconnected", "danger")
+    const toastId = "ws-disconnect-toast";
+    const toast = document.createElement("div");
+    toast.id = toastId; // ← add ID
+    toast.className = "toast align-items-center text-white bg-danger border-0 show";
+    toast.innerHTML = `
+        <div class="d-flex">
+            <div class="toast-body">⚠️ Connection lost. Trying to reconnect...</div>
+        </div>
+    `;
+    document.getElementById("toast-container").appendChild(toast);
+});
+
+socket.on("connect_error", () => setWsStatus("Error", "danger"));
+
+socket.on("reconnect_attempt", (attempt) => {
+    console.log(`🔁 Reconnect attempt ${attempt}`);
+    setWsStatus("Reconnecting...", "warning")
+});
+
+socket.on("reconnect_failed", () => {
+    console.error("❌ Socket.IO failed to reconnect after max attempts");
+    setWsStatus("Reconnect failed", "danger")
+});
+
+// Live output is only streamed for expanded cards (one room per script)
+const openLogs = new Set();
+
+function joinLogs(scriptName) {
+    socket.emit("join_logs", { script: scriptName }, (data) => {
+        const pre = document.getElementById("log-" + scriptName);
+        if (pre && data && data.lines) {
+            pre.textContent = data.lines.length ? data.lines.join("\\n") + "\\n" : "";
+            pre.scrollTop = pre.scrollHeight;
+        }
+    });
+}
+
+socket.on("connect", () => openLogs.forEach(joinLogs));
+
+socket.on("log_update", (data) => {
+    const pre = document.getElementById("log-" + data.script);
+    if (pre && openLogs.has(data.script)) {
+    pre.textContent += data.lines.join("\\n") + "\\n";
+    pre.scrollTop = pre.scrollHeight;
+    }
+});
+socket.on("status_update", (data) => {
+    const headers = document.querySelectorAll(".card-header");
+    headers.forEach(header => {
+        if (header.textContent.trim().startsWith(data.script)) {
+            const card = header.closest(".card");
+            const statusSpan = header.querySelector("span");
+            if (statusSpan) {
+                if (data.status === "running") {
+                    statusSpan.className = "status-running";
+                    statusSpan.textContent = "Running...";
+                } else if (data.status === "success") {
+                    statusSpan.className = "status-success";
+                    statusSpan.textContent = "Success ✔";
+                } else if (data.status === "error") {
+                    statusSpan.className = "status-error";
+                    statusSpan.textContent = "Error ✘";
+                } else if (data.status === "aborted") {
+                    statusSpan.className = "text-warning fw-bold";
+                    statusSpan.textContent = "Aborted ⚠";
+                } else {
+                    statusSpan.className = "";
+                    statusSpan.textContent = "Not running";
+                }
+            }
+            const runBtn = card.querySelector(".run-btn");
+            const cancelForm = card.querySelector(".cancel-form");
+            if (data.status === "running") {
+                if (runBtn) runBtn.style.display = "none";
+                if (cancelForm) cancelForm.style.display = "block";
+            } else {
+                if (runBtn) runBtn.style.display = "inline-block";
+                if (cancelForm) cancelForm.style.display = "none";
+            }
+        }
+    });
+});
+
+let currentPage = 1;
+const perPage = 10;
+
+function formatSimpleDate(raw) {
+    if (!raw) return "";
+    const [date, time] = raw.split("_");
+    return date + " " + time.replace(/-/g, ":");
+}
+const LOG_TAIL_LINES = 500;
+let logView = null;
+
+function fetchLogTail(logFile, before) {
+    const params = new URLSearchParams({ tail: LOG_TAIL_LINES });
+    if (before !== undefined) params.set("before", before);
+    return fetch(`/logfile/${encodeURIComponent(logFile)}?${params}`).then(res => res.json());
+}
+
+function showLogTail(data, prepend) {
+    const pre = document.getElementById("log-content");
+    if (prepend) {
+        pre.textContent = data.content + pre.textContent;
+    } else {
+        pre.textContent = data.content || "(No log content)";
+        pre.scrollTop = pre.scrollHeight;
+    }
+    logView.offset = data.offset;
+    document.getElementById("log-load-earlier").classList.toggle("d-none", !data.has_more);
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+    document.getElementById("log-load-earlier").addEventListener("click", () => {
+        if (!logView) return;
+        fetchLogTail(logView.file, logView.offset)
+            .then(data => data.error ? alert(data.error) : showLogTail(data, true))
+            .catch(err => alert("Failed to load log: " + err));
+    });
+});
+
+function bindHistoryRowClicks() {
+    document.querySelectorAll(".run-history-row").forEach(row => {
+        row.addEventListener("click", () => {
+        const logFile = row.getAttribute("data-logfile");
+        // Only the tail is loaded; earlier output is fetched on demand
+        fetchLogTail(logFile)
+            .then(data => {
+            if (data.error) {
+                alert(data.error);
+                return;
+            }
+            logView = { file: logFile, offset: data.offset };
+            showLogTail(data, false);
+            document.getElementById("log-download").href = `/logfile/${encodeURIComponent(logFile)}`;
+            const modalTitle = document.getElementById("historyModalLabel");
+            modalTitle.textContent = `${row.getAttribute("data-script")} - ${row.getAttribute("data-start")}`;
+            const modal = new bootstrap.Modal(document.getElementById("historyModal"));
+            modal.show();
+            })
+            .catch(err => alert("Failed to load log: " + err));
+        });
+    });
+}
+
+function loadHistoryPage(page) {
+    fetch(`/history?page=${page}&per_page=${perPage}`)
+        .then(response => response.json())
+        .then(data => {
+            const tbody = document.getElementById("run-history-body");
+            tbody.innerHTML = "";
+            for (const record of data.records) {
+                const row = document.createElement("tr");
+                row.className = "run-history-row";
+                row.setAttribute("data-logfile", record.log_file);
+                row.setAttribute("data-script", record.script);
+                row.setAttribute("data-start", formatSimpleDate(record.start));
+                row.innerHTML = `
+                    <td>${record.script}</td>
+                    <td>${formatSimpleDate(record.start)}</td>
+                    <td>${formatSimpleDate(record.end)}</td>
+                    <td>${(record.duration || 0).toFixed(1)}s</td>
+                    <td>${record.status}</td>
+                `;
+                tbody.appendChild(row);
+            }
+
+            const pagination = document.getElementById("history-pagination");
+            pagination.innerHTML = "";
+            const totalPages = data.pages;
+            const page = data.page;
+            const maxVisible = 10;
+
+            function addPage(label, pageNum, disabled, active) {
+                const li = document.createElement("li");
+                li.className = `page-item ${active ? 'active' : ''} ${disabled ? 'disabled' : ''}`;
+                li.innerHTML = `<a class="page-link" href="#">${label}</a>`;
+                li.onclick = (e) => {
+                    e.preventDefault();
+                    if (!disabled && !active) {
+                        currentPage = pageNum;
+                        loadHistoryPage(pageNum);
+                    }
+                };
+                pagination.appendChild(li);
+            }
+
+            addPage('&laquo;', page - 1, page <= 1, false);
+            let start = Math.max(1, page - Math.floor(maxVisible / 2));
+            let end = Math.min(totalPages, start + maxVisible - 1);
+            start = Math.max(1, end - maxVisible + 1);
+            if (start > 1) { addPage(1, 1, false, false); if (start > 2) addPage('...', 0, true, false); }
+            for (let i = start; i <= end; i++) addPage(i, i, false, i === page);
+            if (end < totalPages) { if (end < totalPages - 1) addPage('...', 0, true, false); addPage(totalPages, totalPages, false, false); }
+            addPage('&raquo;', page + 1, page >= totalPages, false);
+
+            // ✅ Re-bind clicks **after** DOM update
+            bindHistoryRowClicks();
+        });
+}
+
+function showEnvModal() {
+    fetch('/env')
+        .then(res => res.json())
+        .then(data => {
+            const pre = document.getElementById("env-content");
+            pre.textContent = Object.entries(data).map(([key, val]) => `${key}=${val}`).join("\\n");
+            const modal = new bootstrap.Modal(document.getElementById("envModal"));
+            modal.show();
+        })
+        .catch(err => alert("Failed to load environment variables: " + err));
+}
+
+function toggleCardBody(header) {
+    const cardBody = header.nextElementSibling;
+    const collapsed = cardBody.classList.toggle("d-none");
+    const scriptName = header.querySelector("strong").textContent.trim();
+    if (collapsed) {
+        openLogs.delete(scriptName);
+        socket.emit("leave_logs", { script: scriptName });
+    } else {
+        openLogs.add(scriptName);
+        if (socket.connected) joinLogs(scriptName);
+    }
+}
+
+function runScript(event, scriptName) {
+    event.preventDefault();
+    const form = event.target;
+    const formData = new FormData(form);
+
+    fetch(`/run/${scriptName}`, {
+        method: "POST",
+        body: formData
+    })
+    .then(res => res.json())
+    .then(data => {
+        showToast(data.error ? "danger" : "info", data.message || data.error);
+    })
+    .catch(err => showToast("danger", "Failed to start script."));
+    return false;
+}
+
+function cancelScript(event, scriptName) {
+    event.preventDefault();
+    fetch(`/cancel/${scriptName}`, { method: "POST" })
+    .then(res => res.json())
+    .then(data => {
+        showToast(data.error ? "danger" : "warning", data.message || data.error);
+    })
+    .catch(err => showToast("danger", "Failed to cancel script."));
+    return false;
+}
+
+function showToast(type, message) {
+    const toast = document.createElement("div");
+    toast.className = `toast align-items-center text-white bg-${type} border-0 show`;
+    toast.innerHTML = `
+        <div class="d-flex">
+            <div class="toast-body">${message}</div>
+            <button type="button" class="btn-close btn-close-white me-2 m-auto" data-bs-dismiss="toast" aria-label="Close"></button>
+        </div>`;
+    document.getElementById("toast-container").appendChild(toast);
+    setTimeout(() => toast.remove(), 5000);
+}
+
+function clearLogs() {
+    if (!confirm("Are you sure you want to delete all logs and history?")) return;
+    fetch("/clear_logs", { method: "POST" })
+        .then(res => res.json())
+        .then(data => showToast("warning", data.message || data.error))
+        .catch(err => showToast("danger", "Failed to clear logs."));
+}
+        setInterval(() => loadHistoryPage(currentPage), 5000); // auto refresh
+loadHistoryPage(currentPage); // initial load
+"""
 
 TEMPLATE = """
 <!DOCTYPE html>
@@ -88,60 +483,7 @@ TEMPLATE = """
     <title>GitHub Script Dashboard</title>
     <link rel="icon" href="https://github.githubassets.com/favicons/favicon.png" type="image/png">
     <link href=\"https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css\" rel=\"stylesheet\">
-    <style>
-        body {
-            padding: 2rem;
-            background: #f8f9fa;
-            display: flex;
-            flex-direction: column;
-            min-height: 100vh;
-            margin: 0;
-        }
-        .container {
-            flex: 1;
-        }
-        .card { margin-bottom: 1rem; }
-
-        .output pre {
-            background: #212529;
-            color: #f8f9fa;
-            padding: 1rem;
-            border-radius: 0.5rem;
-            white-space: pre-wrap;
-            word-break: break-word;
-            max-height: 300px;
-            overflow-y: auto;
-        }
-
-        .status-running { color: #0d6efd; font-weight: bold; }
-        .status-success { color: #198754; font-weight: bold; }
-        .status-error { color: #dc3545; font-weight: bold; }
-
-        #toast-container {
-            position: fixed;
-            top: 1rem;
-            right: 1rem;
-            z-index: 9999;
-        }
-
-        .footer {
-            background: #e9ecef;
-            text-align: center;
-            padding: 0.75rem;
-            font-size: 0.85rem;
-            color: #6c757d;
-            border-top: 1px solid #dee2e6;
-        }
-
-        .header-title img {
-            vertical-align: middle;
-            margin-right: 0.5rem;
-        }
-
-        .run-history-row:hover {
-            cursor: pointer;
-        }
-    </style>
+    <link href="/assets/dashboard.css?v={{ asset_etags['dashboard.css'] }}" rel="stylesheet">
 </head>
 <body>
     <div class=\"container\">
@@ -234,7 +576,13 @@ TEMPLATE = """
             <h5 class=\"modal-title\" id=\"historyModalLabel\">Run Details</h5>
             <button type=\"button\" class=\"btn-close\" data-bs-dismiss=\"modal\" aria-label=\"Close\"></button>
           </div>
-          <div class=\"modal-body\" id=\"modal-body-content\"></div>
+          <div class=\"modal-body\" id=\"modal-body-content\">
+            <div class="d-flex justify-content-between mb-2">
+              <button type="button" class="btn btn-sm btn-outline-secondary d-none" id="log-load-earlier">Load earlier output</button>
+              <a class="btn btn-sm btn-outline-secondary ms-auto" id="log-download" target="_blank">Full log</a>
+            </div>
+            <pre id="log-content"></pre>
+          </div>
         </div>
       </div>
     </div>
@@ -252,254 +600,7 @@ TEMPLATE = """
         </div>
     </div>
     <script src=\"https://cdn.socket.io/4.7.2/socket.io.min.js\"></script>
-    <script>
-        const socket = io({
-            reconnection: true,
-            reconnectionAttempts: 10,      // try 10 times
-            reconnectionDelay: 1000,       // wait 1 second before trying to reconnect
-            reconnectionDelayMax: 5000,    // max 5 seconds delay between attempts
-            timeout: 20000,                // connection timeout
-        });
-        const wsStatus = document.getElementById("ws-status");
-
-        function setWsStatus(state, color) {
-            wsStatus.textContent = "WebSocket: " + state;
-            wsStatus.className = "badge bg-" + color;
-        }
-
-        socket.on("connect", () => {
-            console.log("✅ Socket.IO connected");
-            setWsStatus("Connected", "success");
-            // 🔥 Remove the disconnect toast if it exists
-            const lostToast = document.getElementById("ws-disconnect-toast");
-            if (lostToast) lostToast.remove();            
-        });
-
-        socket.on("disconnect", (reason) => {
-            console.warn("⚠️ Socket.IO disconnected:", reason);
-            setWsStatus("Disconnected", "danger")
-            const toastId = "ws-disconnect-toast";
-            const toast = document.createElement("div");
-            toast.id = toastId; // ← add ID
-            toast.className = "toast align-items-center text-white bg-danger border-0 show";
-            toast.innerHTML = `
-                <div class="d-flex">
-                    <div class="toast-body">⚠️ Connection lost. Trying to reconnect...</div>
-                </div>
-            `;
-            document.getElementById("toast-container").appendChild(toast);
-        });
-
-        socket.on("connect_error", () => setWsStatus("Error", "danger"));
-
-        socket.on("reconnect_attempt", (attempt) => {
-            console.log(`🔁 Reconnect attempt ${attempt}`);
-            setWsStatus("Reconnecting...", "warning")
-        });
-
-        socket.on("reconnect_failed", () => {
-            console.error("❌ Socket.IO failed to reconnect after max attempts");
-            setWsStatus("Reconnect failed", "danger")
-        });
-
-        socket.on("log_update", (data) => {
-            const pre = document.getElementById("log-" + data.script);
-            if (pre) {
-            pre.textContent += data.line + "\\n";
-            pre.scrollTop = pre.scrollHeight;
-            }
-        });
-        socket.on("status_update", (data) => {
-            const headers = document.querySelectorAll(".card-header");
-            headers.forEach(header => {
-                if (header.textContent.trim().startsWith(data.script)) {
-                    const card = header.closest(".card");
-                    const statusSpan = header.querySelector("span");
-                    if (statusSpan) {
-                        if (data.status === "running") {
-                            statusSpan.className = "status-running";
-                            statusSpan.textContent = "Running...";
-                        } else if (data.status === "success") {
-                            statusSpan.className = "status-success";
-                            statusSpan.textContent = "Success ✔";
-                        } else if (data.status === "error") {
-                            statusSpan.className = "status-error";
-                            statusSpan.textContent = "Error ✘";
-                        } else if (data.status === "aborted") {
-                            statusSpan.className = "text-warning fw-bold";
-                            statusSpan.textContent = "Aborted ⚠";
-                        } else {
-                            statusSpan.className = "";
-                            statusSpan.textContent = "Not running";
-                        }
-                    }
-                    const runBtn = card.querySelector(".run-btn");
-                    const cancelForm = card.querySelector(".cancel-form");
-                    if (data.status === "running") {
-                        if (runBtn) runBtn.style.display = "none";
-                        if (cancelForm) cancelForm.style.display = "block";
-                    } else {
-                        if (runBtn) runBtn.style.display = "inline-block";
-                        if (cancelForm) cancelForm.style.display = "none";
-                    }
-                }
-            });
-        });
-
-        let currentPage = 1;
-        const perPage = 10;
-
-        function formatSimpleDate(raw) {
-            if (!raw) return "";
-            const [date, time] = raw.split("_");
-            return date + " " + time.replace(/-/g, ":");
-        }
-        function bindHistoryRowClicks() {
-            document.querySelectorAll(".run-history-row").forEach(row => {
-                row.addEventListener("click", () => {
-                const logFile = row.getAttribute("data-logfile");
-                fetch(`/logfile/${logFile}`)
-                    .then(res => res.json())
-                    .then(data => {
-                    if (data.error) {
-                        alert(data.error);
-                        return;
-                    }
-                    const modalBody = document.getElementById("modal-body-content");
-                    const modalTitle = document.getElementById("historyModalLabel");
-                    modalBody.innerHTML = `<pre>${data.content || "(No log content)"}</pre>`;
-                    modalTitle.textContent = `${row.getAttribute("data-script")} - ${row.getAttribute("data-start")}`;
-                    const modal = new bootstrap.Modal(document.getElementById("historyModal"));
-                    modal.show();
-                    })
-                    .catch(err => alert("Failed to load log: " + err));
-                });
-            });
-        }
-
-        function loadHistoryPage(page) {
-            fetch(`/history?page=${page}&per_page=${perPage}`)
-                .then(response => response.json())
-                .then(data => {
-                    const tbody = document.getElementById("run-history-body");
-                    tbody.innerHTML = "";
-                    for (const record of data.records) {
-                        const row = document.createElement("tr");
-                        row.className = "run-history-row";
-                        row.setAttribute("data-logfile", record.log_file);
-                        row.setAttribute("data-script", record.script);
-                        row.setAttribute("data-start", formatSimpleDate(record.start));
-                        row.innerHTML = `
-                            <td>${record.script}</td>
-                            <td>${formatSimpleDate(record.start)}</td>
-                            <td>${formatSimpleDate(record.end)}</td>
-                            <td>${(record.duration || 0).toFixed(1)}s</td>
-                            <td>${record.status}</td>
-                        `;
-                        tbody.appendChild(row);
-                    }
-
-                    const pagination = document.getElementById("history-pagination");
-                    pagination.innerHTML = "";
-                    const totalPages = data.pages;
-                    const page = data.page;
-                    const maxVisible = 10;
-
-                    function addPage(label, pageNum, disabled, active) {
-                        const li = document.createElement("li");
-                        li.className = `page-item ${active ? 'active' : ''} ${disabled ? 'disabled' : ''}`;
-                        li.innerHTML = `<a class="page-link" href="#">${label}</a>`;
-                        li.onclick = (e) => {
-                            e.preventDefault();
-                            if (!disabled && !active) {
-                                currentPage = pageNum;
-                                loadHistoryPage(pageNum);
-                            }
-                        };
-                        pagination.appendChild(li);
-                    }
-
-                    addPage('&laquo;', page - 1, page <= 1, false);
-                    let start = Math.max(1, page - Math.floor(maxVisible / 2));
-                    let end = Math.min(totalPages, start + maxVisible - 1);
-                    start = Math.max(1, end - maxVisible + 1);
-                    if (start > 1) { addPage(1, 1, false, false); if (start > 2) addPage('...', 0, true, false); }
-                    for (let i = start; i <= end; i++) addPage(i, i, false, i === page);
-                    if (end < totalPages) { if (end < totalPages - 1) addPage('...', 0, true, false); addPage(totalPages, totalPages, false, false); }
-                    addPage('&raquo;', page + 1, page >= totalPages, false);
-
-                    // ✅ Re-bind clicks **after** DOM update
-                    bindHistoryRowClicks();
-                });
-        }
-
-        function showEnvModal() {
-            fetch('/env')
-                .then(res => res.json())
-                .then(data => {
-                    const pre = document.getElementById("env-content");
-                    pre.textContent = Object.entries(data).map(([key, val]) => `${key}=${val}`).join("\\n");
-                    const modal = new bootstrap.Modal(document.getElementById("envModal"));
-                    modal.show();
-                })
-                .catch(err => alert("Failed to load environment variables: " + err));
-        }
-
-        function toggleCardBody(header) {
-            const cardBody = header.nextElementSibling;
-            cardBody.classList.toggle("d-none");
-        }
-
-        function runScript(event, scriptName) {
-            event.preventDefault();
-            const form = event.target;
-            const formData = new FormData(form);
-
-            fetch(`/run/${scriptName}`, {
-                method: "POST",
-                body: formData
-            })
-            .then(res => res.json())
-            .then(data => {
-                showToast(data.error ? "danger" : "info", data.message || data.error);
-            })
-            .catch(err => showToast("danger", "Failed to start script."));
-            return false;
-        }
-
-        function cancelScript(event, scriptName) {
-            event.preventDefault();
-            fetch(`/cancel/${scriptName}`, { method: "POST" })
-            .then(res => res.json())
-            .then(data => {
-                showToast(data.error ? "danger" : "warning", data.message || data.error);
-            })
-            .catch(err => showToast("danger", "Failed to cancel script."));
-            return false;
-        }
-
-        function showToast(type, message) {
-            const toast = document.createElement("div");
-            toast.className = `toast align-items-center text-white bg-${type} border-0 show`;
-            toast.innerHTML = `
-                <div class="d-flex">
-                    <div class="toast-body">${message}</div>
-                    <button type="button" class="btn-close btn-close-white me-2 m-auto" data-bs-dismiss="toast" aria-label="Close"></button>
-                </div>`;
-            document.getElementById("toast-container").appendChild(toast);
-            setTimeout(() => toast.remove(), 5000);
-        }
-
-        function clearLogs() {
-            if (!confirm("Are you sure you want to delete all logs and history?")) return;
-            fetch("/clear_logs", { method: "POST" })
-                .then(res => res.json())
-                .then(data => showToast("warning", data.message || data.error))
-                .catch(err => showToast("danger", "Failed to clear logs."));
-        }
-                setInterval(() => loadHistoryPage(currentPage), 5000); // auto refresh
-        loadHistoryPage(currentPage); // initial load
-    </script>
+    <script src="/assets/dashboard.js?v={{ asset_etags['dashboard.js'] }}"></script>
     
     <script src=\"https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/js/bootstrap.bundle.min.js\"></script>
     <footer class="footer">
@@ -517,18 +618,203 @@ TEMPLATE = """
 </html>
 """
 
+# Parsed and compiled once instead of on every request
+DASHBOARD_TEMPLATE = app.jinja_env.from_string(TEMPLATE)
+DASHBOARD_ASSETS = {
+    "dashboard.css": (DASHBOARD_CSS, "text/css"),
+    "dashboard.js": (DASHBOARD_JS, "application/javascript"),
+}
+ASSET_ETAGS = {
+    name: hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+    for name, (content, _) in DASHBOARD_ASSETS.items()
+}
+# Asset URLs carry the ETag, so browsers can keep them for long
+ASSET_MAX_AGE = 7 * 86400
+VERSION = read_version()
+
+# Background task -> (time of last loop, loop interval), see /ready
+heartbeats = {}
+
+def heartbeat(task, interval):
+    heartbeats[task] = (time.time(), interval)
+
+def _prom_escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _prom_labels(**labels):
+    return "{" + ",".join(f'{key}="{_prom_escape(value)}"' for key, value in labels.items()) + "}"
+
+def render_prometheus_metrics(runs, latest):
+    """
+    Render run history as Prometheus text exposition format.
+
+    Args:
+        runs (dict): (script, status) -> number of runs in history.
+        latest (dict): script -> its most recent run record, with metrics.
+    """
+    families = {}
+
+    def add(name, kind, help_text, labels, value):
+        family = families.setdefault(name, {"type": kind, "help": help_text, "samples": []})
+        family["samples"].append((name, labels, value))
+
+    def add_sample(family_name, name, labels, value):
+        families[family_name]["samples"].append((name, labels, value))
+
+    for (script, status), count in sorted(runs.items(), key=lambda item: (str(item[0][0]), str(item[0][1]))):
+        add("github_scripts_runs_total", "counter", "Script runs in history by status",
+            _prom_labels(script=script, status=status), count)
+
+    for script, record in sorted(latest.items(), key=lambda item: str(item[0])):
+        labels = _prom_labels(script=script)
+        add("github_scripts_last_run_duration_seconds", "gauge", "Wall time of the latest run", labels,
+            record.get("duration", 0))
+        add("github_scripts_last_run_success", "gauge", "1 if the latest run succeeded", labels,
+            1 if record.get("status") == "success" else 0)
+        try:
+            started = datetime.strptime(record["start"], "%Y-%m-%d_%H-%M-%S").timestamp()
+            add("github_scripts_last_run_start_timestamp_seconds", "gauge", "Start time of the latest run",
+                labels, started)
+        except (KeyError, ValueError):
+            pass
+
+        metrics = record.get("metrics") or {}
+        bounds = metrics.get("latency_buckets", [])
+        for endpoint, entry in sorted(metrics.get("endpoints", {}).items()):
+            endpoint_labels = _prom_labels(script=script, endpoint=endpoint)
+            for key, help_text in (
+                ("calls", "GitHub API calls in the latest run"),
+                ("errors", "GitHub API errors in the latest run"),
+                ("retries", "GitHub API retries in the latest run"),
+                ("cache_hits", "GitHub API 304 Not Modified replies in the latest run"),
+                ("bytes", "GitHub API response bytes in the latest run"),
+            ):
+                add(f"github_scripts_last_run_api_{key}", "gauge", help_text, endpoint_labels, entry.get(key, 0))
+            name = "github_scripts_last_run_api_latency_seconds"
+            families.setdefault(name, {"type": "histogram", "help": "GitHub API latency in the latest run", "samples": []})
+            cumulative = 0
+            buckets = entry.get("buckets", [])
+            for bound, count in zip([*bounds, "+Inf"], buckets):
+                cumulative += count
+                add_sample(name, f"{name}_bucket", _prom_labels(script=script, endpoint=endpoint, le=bound), cumulative)
+            add_sample(name, f"{name}_sum", endpoint_labels, entry.get("total", 0))
+            add_sample(name, f"{name}_count", endpoint_labels, entry.get("calls", 0))
+        for resource, limit in sorted(metrics.get("rate_limits", {}).items()):
+            resource_labels = _prom_labels(script=script, resource=resource)
+            add("github_scripts_rate_limit_remaining", "gauge", "GitHub rate limit left after the latest run",
+                resource_labels, limit.get("remaining", 0))
+            add("github_scripts_rate_limit_limit", "gauge", "GitHub rate limit size", resource_labels,
+                limit.get("limit", 0))
+
+    lines = []
+    for name, family in families.items():
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for sample_name, labels, value in family["samples"]:
+            lines.append(f"{sample_name}{labels} {value}")
+    return "\n".join(lines) + "\n"
+
+def log_room(script_name):
+    return f"logs:{script_name}"
+
+def _emit_log_batch(script_name):
+    # Caller holds log_batch_lock, which keeps batches in order
+    lines = pending_log_lines[script_name]
+    if lines:
+        socketio.emit("log_update", {"script": script_name, "lines": lines}, to=log_room(script_name))
+        pending_log_lines[script_name] = []
+    log_file = live_log_files.get(script_name)
+    if log_file:
+        log_file.flush()
+
+def append_log_line(script_name, line):
+    """
+    Record a line of live output.
+
+    The line goes to the run log on disk, which is flushed with every
+    batch, and to a ring buffer of the last LOG_LIVE_LINES lines for the
+    dashboard, so memory use does not depend on how much a script prints.
+    Lines reach the browser in batches, sent by log_batch_flusher or as
+    soon as LOG_BATCH_MAX_LINES are waiting, and only to clients that
+    have the script's card expanded.
+    """
+    with log_batch_lock:
+        log_file = live_log_files.get(script_name)
+        if log_file:
+            log_file.write(line + "\n")
+        execution_logs[script_name].append(line)
+        pending_log_lines[script_name].append(line)
+        if len(pending_log_lines[script_name]) >= LOG_BATCH_MAX_LINES:
+            _emit_log_batch(script_name)
+
+def flush_log_lines(script_name=None):
+    with log_batch_lock:
+        for name in [script_name] if script_name else list(pending_log_lines):
+            _emit_log_batch(name)
+
+def live_logs():
+    # Copies, so the ring buffers can keep moving while a response is rendered
+    with log_batch_lock:
+        return {name: list(lines) for name, lines in execution_logs.items()}
+
+def open_live_log(script_name, log_path):
+    with log_batch_lock:
+        live_log_files[script_name] = open(log_path, "w")
+
+def close_live_log(script_name):
+    with log_batch_lock:
+        _emit_log_batch(script_name)
+        log_file = live_log_files.pop(script_name, None)
+    if log_file:
+        log_file.close()
+
+def log_batch_flusher():
+    while True:
+        heartbeat("log_batch_flusher", LOG_BATCH_INTERVAL)
+        socketio.sleep(LOG_BATCH_INTERVAL)
+        flush_log_lines()
+
+socketio.start_background_task(log_batch_flusher)
+
+@socketio.on("join_logs")
+def join_logs(data):
+    """
+    Subscribe to a script's live output. The reply holds the output so far;
+    everything after it arrives as log_update batches.
+    """
+    script_name = (data or {}).get("script")
+    if script_name not in SCRIPTS:
+        return {"error": f"Unknown script '{script_name}'"}
+    with log_batch_lock:
+        # Pending lines will still be sent to the room, so leave them out here
+        lines = list(execution_logs[script_name])
+        snapshot = lines[:max(0, len(lines) - len(pending_log_lines[script_name]))]
+        join_room(log_room(script_name))
+    return {"script": script_name, "lines": snapshot}
+
+@socketio.on("leave_logs")
+def leave_logs(data):
+    script_name = (data or {}).get("script")
+    if script_name in SCRIPTS:
+        leave_room(log_room(script_name))
+
 def run_script_with_live_output(script_name, arg_values=None):
     if arg_values is None:
         arg_values = []
     execution_status[script_name] = "running"
-    execution_logs[script_name] = []
+    with log_batch_lock:
+        execution_logs[script_name].clear()
+        pending_log_lines[script_name] = []
     socketio.emit("status_update", {"script": script_name, "status": "running"})  # ← NEW
 
     start_time = datetime.now()
     start_str = start_time.strftime('%Y-%m-%d_%H-%M-%S')
     end_time = None
+    metrics_path = os.path.join(LOG_DIR, f".{script_name}_{start_str}.metrics.json")
+    log_filename = f"{script_name}_{start_str.replace(':', '-')}.log"
 
     try:
+        open_live_log(script_name, os.path.join(LOG_DIR, log_filename))
         script = SCRIPTS[script_name]
         script_path = os.path.abspath(script["path"])
         arg_definitions = script.get("args", [])
@@ -536,23 +822,25 @@ def run_script_with_live_output(script_name, arg_values=None):
         valid, reason = is_safe_args(arg_values, arg_definitions)
         if not valid:
             raise ValueError(f"Unsafe or invalid arguments: {reason}")
+        env = os.environ.copy()
+        env["GITHUB_METRICS_FILE"] = metrics_path
         process = subprocess.Popen(
             [sys.executable, "-u", script_path, *arg_values],
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             text=True,
             bufsize=1,  # Line-buffered output
-            env=os.environ.copy()
+            env=env
         )
         app.logger.info("Running script: %s %s", script_path, arg_values)
         script_threads[script_name] = {"thread": threading.current_thread(), "process": process}
 
         for line in iter(process.stdout.readline, ''):
-            line = line.strip()
-            execution_logs[script_name].append(line)
-            socketio.emit("log_update", {"script": script_name, "line": line})
+            append_log_line(script_name, line.strip())
 
         process.wait()
+        # Send the last batch before the status changes
+        flush_log_lines(script_name)
         if execution_status[script_name] == "aborted":
             # Already handled by cancel route
             pass
@@ -563,7 +851,8 @@ def run_script_with_live_output(script_name, arg_values=None):
             execution_status[script_name] = "error"
             socketio.emit("status_update", {"script": script_name, "status": "error"})
     except Exception as e:
-        execution_logs[script_name].append(f"Exception: {str(e)}")
+        append_log_line(script_name, f"Exception: {str(e)}")
+        flush_log_lines(script_name)
         if execution_status[script_name] != "aborted":
             execution_status[script_name] = "error"
             socketio.emit("status_update", {"script": script_name, "status": "error"})
@@ -571,35 +860,79 @@ def run_script_with_live_output(script_name, arg_values=None):
         end_time = datetime.now()
         end_str = end_time.strftime('%Y-%m-%d_%H-%M-%S')
         duration_seconds = (end_time - start_time).total_seconds()
-        log_filename = f"{script_name}_{start_str.replace(':', '-')}.log"
-        run_history.append({
+        close_live_log(script_name)
+        record = {
             "script": script_name,
             "start": start_str,
             "end": end_str,
             "duration": duration_seconds,
             "status": execution_status[script_name],
             "log_file": log_filename
-        })
-        with open(HISTORY_FILE, "w") as f:
-            json.dump(run_history, f, indent=2)
+        }
+        metrics = run_history.read_run_metrics(metrics_path)
+        if metrics:
+            record["metrics"] = metrics
+        with history_lock:
+            run_history.append_run(history_db, record)
+
+        flush_outbox()
+
+def flush_outbox():
+    """
+    Deliver queued notifications in a separate process (see notify_utils).
+    Does nothing when the outbox is empty.
+    """
+    try:
+        if not any(name.endswith(".json") for name in os.listdir(OUTBOX_DIR)):
+            return
+    except FileNotFoundError:
+        return
+    try:
+        result = subprocess.run(
+            [sys.executable, NOTIFY_UTILS, "--flush"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            env=os.environ.copy()
+        )
+        if result.stdout.strip():
+            app.logger.info("Outbox flush: %s", result.stdout.strip())
+    except Exception as e:
+        app.logger.error(f"Outbox flush failed: {str(e)}")
+
+def outbox_flusher():
+    # Retries notifications that failed earlier, from cron runs or the dashboard
+    while True:
+        heartbeat("outbox_flusher", OUTBOX_FLUSH_INTERVAL)
+        socketio.sleep(OUTBOX_FLUSH_INTERVAL)
+        flush_outbox()
 
-        log_path = os.path.join(LOG_DIR, log_filename)
-        with open(log_path, "w") as log_file:
-            log_file.write("\n".join(execution_logs[script_name]))
+if os.path.exists(NOTIFY_UTILS):
+    socketio.start_background_task(outbox_flusher)
 
 @app.route("/")
 def home():
-    version = read_version()
     year = datetime.now().year
-    return render_template_string(
-        TEMPLATE,
+    return render_template(
+        DASHBOARD_TEMPLATE,
         scripts=SCRIPTS,
         execution_status=execution_status,
-        execution_logs=execution_logs,
-        run_history=run_history,
-        version=version,
+        execution_logs=live_logs(),
+        asset_etags=ASSET_ETAGS,
+        version=VERSION,
         year=year
     )
+
+@app.route("/assets/<asset_name>")
+def get_asset(asset_name):
+    if asset_name not in DASHBOARD_ASSETS:
+        return "Asset not found", 404
+    content, mimetype = DASHBOARD_ASSETS[asset_name]
+    response = Response(content, mimetype=mimetype)
+    response.set_etag(ASSET_ETAGS[asset_name])
+    response.cache_control.public = True
+    response.cache_control.max_age = ASSET_MAX_AGE
+    return response.make_conditional(request)
 @app.route("/run/<script_name>", methods=["POST"])
 def run_script(script_name):
     if script_name not in SCRIPTS:
@@ -626,7 +959,8 @@ def cancel_script(script_name):
         if process.poll() is None:
             process.terminate()
             execution_status[script_name] = "aborted"
-            execution_logs[script_name].append("Script was aborted by user.")
+            append_log_line(script_name, "Script was aborted by user.")
+            flush_log_lines(script_name)
             socketio.emit("status_update", {"script": script_name, "status": "aborted"})
             return jsonify({"message": f"Aborted script '{script_name}'."}), 200
         else:
@@ -636,7 +970,8 @@ def cancel_script(script_name):
 
 @app.route("/logs", methods=["GET"])
 def logs():
-    return jsonify(execution_logs)
+    # Live output only; the complete output of a run is in its run log
+    return jsonify(live_logs())
 
 @app.route("/download/<script_name>")
 def download_script(script_name):
@@ -656,16 +991,133 @@ def environment_variables():
             safe_env[k] = v
     return jsonify(safe_env)
 
+LOG_STREAM_CHUNK = 64 * 1024
+LOG_TAIL_MAX_LINES = 10000
+LOG_OFFSET_MAX_BYTES = 1024 * 1024
+
+def _log_size(log_path):
+    if log_path.endswith(".gz"):
+        # ISIZE trailer: uncompressed size modulo 2**32, exact for any realistic log
+        with open(log_path, "rb") as f:
+            f.seek(-4, os.SEEK_END)
+            return struct.unpack("<I", f.read(4))[0]
+    return os.path.getsize(log_path)
+
+def _open_log_binary(log_path):
+    return gzip.open(log_path, "rb") if log_path.endswith(".gz") else open(log_path, "rb")
+
+def _tail_log(log_path, lines, before=None):
+    """
+    Return the last `lines` lines of a log that end at or before byte
+    offset `before` (the end of the file when omitted).
+
+    Plain logs are searched backwards through an mmap, so only the pages
+    holding the tail are read. Compressed logs cannot be read backwards
+    and are streamed once, keeping just the last lines.
+
+    Returns:
+        tuple[bytes, int, int]: The data, and its start and end offsets.
+    """
+    if log_path.endswith(".gz"):
+        kept = deque(maxlen=lines)
+        offset = 0
+        with gzip.open(log_path, "rb") as f:
+            for line in f:
+                if before is not None and offset + len(line) > before:
+                    break
+                kept.append((offset, line))
+                offset += len(line)
+        if not kept:
+            return b"", offset, offset
+        return b"".join(line for _, line in kept), kept[0][0], offset
+
+    size = os.path.getsize(log_path)
+    end = size if before is None else max(0, min(before, size))
+    if end == 0:
+        return b"", 0, 0
+    with open(log_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        search_end = end - 1 if m[end - 1:end] == b"\n" else end
+        start = 0
+        for _ in range(lines):
+            newline = m.rfind(b"\n", 0, search_end)
+            if newline == -1:
+                start = 0
+                break
+            start = newline + 1
+            search_end = newline
+        return m[start:end], start, end
+
+def _stream_log(log_path, start, length):
+    with _open_log_binary(log_path) as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(LOG_STREAM_CHUNK, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
 @app.route("/logfile/<log_filename>")
 def get_logfile(log_filename):
-    safe_filename = os.path.basename(log_filename)  # avoid path traversal
-    log_path = os.path.normpath(os.path.join(LOG_DIR, safe_filename))
-    if not log_path.startswith(LOG_DIR) or not os.path.exists(log_path):
+    """
+    Serve a run log.
+
+    ?tail=N[&before=OFFSET]  JSON with the last N lines (before a byte offset)
+    ?offset=OFFSET[&length=BYTES]  JSON with the bytes from an offset on
+    no parameters  the raw log as text/plain, streamed, with Range support
+
+    JSON replies carry byte offsets so clients can fetch earlier or newer
+    output incrementally. Gzipped logs are served transparently.
+    """
+    # Old logs are gzipped by log_retention; serve them transparently
+    log_path = log_retention.resolve_log_path(LOG_DIR, log_filename)  # basename only, no traversal
+    if not log_path:
         return jsonify({"error": "Log file not found"}), 404
-    with open(log_path, "r") as f:
-        content = f.read()
-    return jsonify({"content": content})
 
+    tail = request.args.get("tail", type=int)
+    before = request.args.get("before", type=int)
+    offset = request.args.get("offset", type=int)
+    length = request.args.get("length", LOG_OFFSET_MAX_BYTES, type=int)
+
+    if tail is not None:
+        data, start, end = _tail_log(log_path, max(1, min(tail, LOG_TAIL_MAX_LINES)), before)
+        return jsonify({
+            "content": data.decode("utf-8", errors="replace"),
+            "offset": start,
+            "end": end,
+            "has_more": start > 0,
+        })
+
+    if offset is not None:
+        offset = max(0, offset)
+        length = max(0, min(length, LOG_OFFSET_MAX_BYTES))
+        data = b"".join(_stream_log(log_path, offset, length))
+        size = _log_size(log_path)
+        return jsonify({
+            "content": data.decode("utf-8", errors="replace"),
+            "offset": offset,
+            "next_offset": offset + len(data),
+            "size": size,
+            "eof": offset + len(data) >= size,
+        })
+
+    if not log_path.endswith(".gz"):
+        # Streams from disk and answers Range / If-None-Match requests itself
+        return send_file(log_path, mimetype="text/plain", conditional=True, max_age=0)
+
+    size = _log_size(log_path)
+    status, start, stop = 200, 0, size
+    headers = {"Accept-Ranges": "bytes"}
+    if request.range and request.range.units == "bytes":
+        byte_range = request.range.range_for_length(size)
+        if byte_range is None:
+            return Response(status=416, headers={"Content-Range": f"bytes */{size}"})
+        start, stop = byte_range
+        status = 206
+        headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+    headers["Content-Length"] = str(stop - start)
+    return Response(_stream_log(log_path, start, stop - start), status=status,
+                    mimetype="text/plain", headers=headers, direct_passthrough=True)
 
 @app.route("/history")
 def get_history():
@@ -674,24 +1126,18 @@ def get_history():
         per_page = int(request.args.get("per_page", 10))
     except ValueError:
         return jsonify({"error": "Invalid pagination parameters"}), 400
+    if page < 1 or per_page < 1:
+        return jsonify({"error": "Invalid pagination parameters"}), 400
 
-    # Always read from disk and sort by start timestamp (newest first)
+    # Newest first, paged by the index on start time
     try:
-        with open(HISTORY_FILE, "r") as f:
-            history = json.load(f)
-            history.sort(
-                key=lambda x: datetime.strptime(x["start"], "%Y-%m-%d_%H-%M-%S"),
-                reverse=True
-            )
+        with history_lock:
+            records, total = run_history.list_runs(history_db, page, per_page)
     except Exception as e:
         app.logger.error(f"Failed to read history: {str(e)}")
         return jsonify({"error": "An internal error occurred while reading history."}), 500
 
-    total = len(history)
     pages = (total + per_page - 1) // per_page
-    start = (page - 1) * per_page
-    end = start + per_page
-    records = history[start:end]
 
     return jsonify({
         "records": records,
@@ -703,21 +1149,58 @@ def get_history():
 @app.route("/clear_logs", methods=["POST"])
 def clear_logs():
     try:
-        global run_history
-        for record in run_history:
-            log_file = record.get("log_file")
-            if log_file:
-                log_path = os.path.join(LOG_DIR, log_file)
-                if os.path.exists(log_path):
+        with history_lock:
+            for log_file in run_history.log_files(history_db):
+                log_path = log_retention.resolve_log_path(LOG_DIR, log_file)
+                if log_path:
                     os.remove(log_path)
-        run_history = []
-        with open(HISTORY_FILE, "w") as f:
-            json.dump(run_history, f, indent=2)
+            run_history.clear(history_db)
         return jsonify({"message": "Logs and history cleared."}), 200
     except Exception as e:
         app.logger.error(f"Failed to clear logs: {str(e)}")
         return jsonify({"error": "An internal error occurred while clearing logs."}), 500
 
+@app.route("/metrics")
+def metrics():
+    try:
+        with history_lock:
+            runs = run_history.run_counts(history_db)
+            latest = {record["script"]: record for record in run_history.latest_runs(history_db)}
+    except Exception as e:
+        app.logger.error(f"Failed to read history: {str(e)}")
+        return "# history unavailable\n", 500, {"Content-Type": "text/plain; version=0.0.4"}
+    return render_prometheus_metrics(runs, latest), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
 @app.route("/health")
 def health():
     return jsonify(status="ok")
+
+@app.route("/ready")
+def ready():
+    """
+    Readiness probe for the Docker healthcheck. Answers from memory only:
+    no template rendering, database or disk access.
+
+    Returns 503 when a background task has stopped looping. Script runs
+    whose worker thread died while marked running are reported as stalled.
+    """
+    now = time.time()
+    tasks = {}
+    for task, (last_beat, interval) in heartbeats.items():
+        age = now - last_beat
+        tasks[task] = {"age": round(age, 1), "ok": age <= max(4 * interval, 30)}
+    running, stalled = [], []
+    for name, status in execution_status.items():
+        if status != "running":
+            continue
+        thread_info = script_threads.get(name)
+        alive = thread_info and thread_info["thread"].is_alive()
+        (running if alive else stalled).append(name)
+    ok = bool(SCRIPTS) and all(task["ok"] for task in tasks.values())
+    return jsonify(
+        status="ok" if ok else "unavailable",
+        scripts=len(SCRIPTS),
+        tasks=tasks,
+        running=running,
+        stalled=stalled,
+    ), 200 if ok else 503
@@ -1,21 +1,104 @@
 import os
-import requests
+import json
 import time
 import argparse
-from report_utils import wrap_html_report
-from notify_utils import send_email_report, send_telegram_report
+import threading
+import heapq
+import hashlib
+import itertools
+from fnmatch import fnmatch
+from urllib.parse import quote
+import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import github_client
+from report_utils import ReportBuilder
+from notify_utils import queue_email_report, queue_telegram_report
 
 # === CONFIG ===
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 GITHUB_USER = os.getenv("GITHUB_USER")
 MERGE_METHOD = os.getenv("MERGE_METHOD", "squash")
-REQUESTS_TIMEOUT = 10
-
-HEADERS = {
-    "Authorization": f"token {GITHUB_TOKEN}",
-    "Accept": "application/vnd.github.v3+json",
-    "User-Agent": "github-scripts-bot"
+try:
+    DISCOVERY_WORKERS = int(os.getenv("AUTO_MERGE_WORKERS", 8))
+except ValueError:
+    print("⚠️ Invalid AUTO_MERGE_WORKERS, using default 8")
+    DISCOVERY_WORKERS = 8
+try:
+    MERGE_WORKERS = int(os.getenv("AUTO_MERGE_MERGE_WORKERS", 4))
+except ValueError:
+    print("⚠️ Invalid AUTO_MERGE_MERGE_WORKERS, using default 4")
+    MERGE_WORKERS = 4
+MERGE_RETRIES = 3
+try:
+    REPOLL_ATTEMPTS = int(os.getenv("AUTO_MERGE_REPOLL_ATTEMPTS", 4))
+except ValueError:
+    print("⚠️ Invalid AUTO_MERGE_REPOLL_ATTEMPTS, using default 4")
+    REPOLL_ATTEMPTS = 4
+REPOLL_DELAY = 3  # seconds, doubled on every re-check
+BUSY_REPO_DELAY = 0.5
+DISCOVERY_BACKEND = os.getenv("AUTO_MERGE_BACKEND", "rest")
+STATE_FILE = os.getenv("AUTO_MERGE_STATE_FILE", "/var/log/github-scripts/auto_merge_state.json")
+# Empty: the user plus their organisations (see search_owners)
+SEARCH_OWNERS = [owner.strip() for owner in os.getenv("AUTO_MERGE_OWNERS", "").split(",") if owner.strip()]
+SEARCH_LIMIT = 1000  # GitHub search API limit
+
+# === Repository selection ===
+REPO_AFFILIATION = os.getenv("AUTO_MERGE_AFFILIATION", "owner,collaborator,organization_member")
+REPO_VISIBILITY = os.getenv("AUTO_MERGE_VISIBILITY", "all")
+SKIP_ARCHIVED = os.getenv("AUTO_MERGE_SKIP_ARCHIVED", "true").lower() in ("1", "true", "yes")
+SKIP_FORKS = os.getenv("AUTO_MERGE_SKIP_FORKS", "false").lower() in ("1", "true", "yes")
+REPO_INCLUDE = [p.strip() for p in os.getenv("AUTO_MERGE_INCLUDE", "").split(",") if p.strip()]
+REPO_EXCLUDE = [p.strip() for p in os.getenv("AUTO_MERGE_EXCLUDE", "").split(",") if p.strip()]
+REPOS_CACHE_FILE = os.getenv("AUTO_MERGE_REPOS_CACHE", "/var/log/github-scripts/cache/repos.json")
+try:
+    REPOS_CACHE_TTL = int(os.getenv("AUTO_MERGE_REPOS_TTL", 0))
+except ValueError:
+    print("⚠️ Invalid AUTO_MERGE_REPOS_TTL, using default 0 (no cache)")
+    REPOS_CACHE_TTL = 0
+
+PUSH_PERMISSIONS = {"ADMIN", "MAINTAIN", "WRITE"}
+GRAPHQL_MERGEABLE = {"MERGEABLE": True, "CONFLICTING": False}
+PR_FIELDS = """
+    number
+    title
+    url
+    author { login __typename }
+    headRefOid
+    baseRefOid
+    baseRefName
+    baseRef { target { oid } }
+    mergeable
+    mergeStateStatus
+"""
+REPOS_QUERY = """
+query($cursor: String, $affiliations: [RepositoryAffiliation], $ownerAffiliations: [RepositoryAffiliation], $privacy: RepositoryPrivacy) {
+  viewer {
+    repositories(first: 50, after: $cursor, affiliations: $affiliations, ownerAffiliations: $ownerAffiliations, privacy: $privacy) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        nameWithOwner
+        viewerPermission
+        isArchived
+        isFork
+        pullRequests(states: OPEN, first: 50) {
+          pageInfo { hasNextPage endCursor }
+          nodes { %s }
+        }
+      }
+    }
+  }
+}
+""" % PR_FIELDS
+REPO_PRS_QUERY = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(states: OPEN, first: 100, after: $cursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes { %s }
+    }
+  }
 }
+""" % PR_FIELDS
 
 if not all([GITHUB_USER, GITHUB_TOKEN]):
     raise ValueError("❌ Missing one or more required environment variables.")
@@ -24,28 +107,210 @@ unmerged_prs = []
 merged_prs = []
 processed_prs = []
 
+# Per-PR state carried between runs, stored per target user:
+# "<repo>#<number>" -> {head_sha, base_sha, mergeable_state, outcome}
+previous_state = {}
+current_state = {}
+state_lock = threading.Lock()
+
+
+def _read_state_file(path):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Ignoring unreadable state file {path}: {e}")
+        return {}
+
+
+def load_state(target_user, path=STATE_FILE):
+    """
+    Loads the per-PR state persisted by the previous run for a user.
+
+    Returns:
+        dict: State keyed by '<repo>#<number>', empty if missing or unreadable.
+    """
+    return _read_state_file(path).get(target_user, {})
+
+
+def save_state(target_user, state, path=STATE_FILE):
+    """
+    Atomically writes the per-PR state of this run for the next one.
+    State recorded for other users is left untouched.
+    """
+    data = _read_state_file(path)
+    data[target_user] = state
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️ Failed to save state file {path}: {e}")
+
 
-def get_repos():
+def _head_sha(pr):
+    return (pr.get("head") or {}).get("sha")
+
+
+def _base_tip(repo, pr, base_tips, fetch=True):
+    """
+    Returns the current head commit of a PR's base branch.
+
+    The PR's own base.sha is the base commit from when the PR was opened or
+    last pushed, so it does not move when the base branch does. Tips are
+    cached per repository in base_tips (ref -> sha); a ref mapped to None
+    has moved since and is fetched again.
+
+    Args:
+        repo (str): Full repository name.
+        pr (dict): Pull request data.
+        base_tips (dict): Per-repository cache of branch tips.
+        fetch (bool): Ask the API when the tip is not known yet.
+
+    Returns:
+        str or None: The commit SHA, or None if it is unknown.
+    """
+    base = pr.get("base") or {}
+    ref = base.get("ref")
+    if not ref:
+        return None
+    # GraphQL discovery already carries the tip, valid until we merge into the branch
+    tip = base_tips.get(ref, base.get("tip"))
+    if tip or not fetch:
+        return tip
+    try:
+        response = github_client.get(f"/repos/{repo}/branches/{quote(ref)}", cache=False)
+    except requests.RequestException:
+        return None
+    if response.status_code != 200:
+        print(f"⚠️ Failed to fetch branch {ref} of {repo}")
+        return None
+    tip = response.json()["commit"]["sha"]
+    base_tips[ref] = tip
+    return tip
+
+
+def _remember(repo, pr, details, outcome, base_sha=None):
+    head_sha = _head_sha(details) or _head_sha(pr)
+    with state_lock:
+        current_state[f"{repo}#{pr['number']}"] = {
+            "head_sha": head_sha,
+            # Base branch tip the verdict was made against, if it was known beforehand
+            "base_sha": base_sha,
+            "mergeable_state": details.get("mergeable_state", "unknown"),
+            "outcome": outcome,
+        }
+
+
+def _unchanged_conflict(repo, pr, base_tips):
+    """
+    Returns the previous state of a PR if it was conflicted and neither its
+    head nor its base branch has moved since, so the verdict still holds.
+    """
+    previous = previous_state.get(f"{repo}#{pr['number']}")
+    if not previous or previous.get("outcome") != "conflict":
+        return None
+    head_sha = _head_sha(pr)
+    if not head_sha or previous.get("head_sha") != head_sha:
+        return None
+    # Fetched even without a stored tip, so the new verdict can be stored with one
+    tip = _base_tip(repo, pr, base_tips)
+    if not tip or previous.get("base_sha") != tip:
+        return None
+    return previous
+
+
+def repo_selected(full_name, archived=False, fork=False):
+    """
+    Applies the archived/fork switches and include/exclude name globs.
+
+    Args:
+        full_name (str): Repository full name (e.g., 'user/repo').
+        archived (bool): Whether the repository is archived.
+        fork (bool): Whether the repository is a fork.
+
+    Returns:
+        bool: True if the repository should be processed.
+    """
+    if archived and SKIP_ARCHIVED:
+        return False
+    if fork and SKIP_FORKS:
+        return False
+    if REPO_INCLUDE and not any(fnmatch(full_name, pattern) for pattern in REPO_INCLUDE):
+        return False
+    return not any(fnmatch(full_name, pattern) for pattern in REPO_EXCLUDE)
+
+
+def _repos_cache_key():
+    # The cached list is only valid for the filters it was built with
+    settings = [REPO_AFFILIATION, REPO_VISIBILITY, SKIP_ARCHIVED, SKIP_FORKS, REPO_INCLUDE, REPO_EXCLUDE]
+    token_hash = hashlib.sha256((GITHUB_TOKEN or "").encode("utf-8")).hexdigest()[:12]
+    return hashlib.sha256(json.dumps([token_hash, settings]).encode("utf-8")).hexdigest()
+
+
+def _load_cached_repos():
+    if REPOS_CACHE_TTL <= 0:
+        return None
+    try:
+        with open(REPOS_CACHE_FILE, "r") as f:
+            cached = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if cached.get("key") != _repos_cache_key() or time.time() - cached.get("fetched", 0) > REPOS_CACHE_TTL:
+        return None
+    return cached.get("repos")
+
+
+def _store_cached_repos(repos):
+    if REPOS_CACHE_TTL <= 0:
+        return
+    tmp_path = f"{REPOS_CACHE_FILE}.tmp"
+    try:
+        os.makedirs(os.path.dirname(REPOS_CACHE_FILE) or ".", exist_ok=True)
+        with open(tmp_path, "w") as f:
+            json.dump({"key": _repos_cache_key(), "fetched": time.time(), "repos": repos}, f)
+        os.replace(tmp_path, REPOS_CACHE_FILE)
+    except OSError as e:
+        print(f"⚠️ Failed to cache repository list: {e}")
+
+
+def get_repos(use_cache=True):
     """
     Fetches the list of repositories the authenticated user has push access to.
 
+    Affiliation and visibility are filtered server-side; archived repos,
+    forks and include/exclude globs are applied before any PR is listed.
+    The result is cached for AUTO_MERGE_REPOS_TTL seconds.
+
+    Args:
+        use_cache (bool): Reuse a cached list that is still within its TTL.
+
     Returns:
         list[str]: List of repository full names (e.g., 'user/repo').
     """
-    repos = []
-    page = 1
-    while True:
-        url = f'https://api.github.com/user/repos?per_page=100&page={page}'
-        response = requests.get(url, headers=HEADERS, timeout=REQUESTS_TIMEOUT)
-        if response.status_code != 200:
-            print("❌ Failed to fetch repos")
-            break
-        data = response.json()
-        if not data:
-            break
-        repos.extend(data)
-        page += 1
-    return [r['full_name'] for r in repos if r['permissions']['push']]
+    if use_cache:
+        cached = _load_cached_repos()
+        if cached is not None:
+            print(f"🗃️ Using cached repository list ({len(cached)} repositories)")
+            return cached
+
+    names = []
+    params = {"per_page": 100, "affiliation": REPO_AFFILIATION, "visibility": REPO_VISIBILITY}
+    try:
+        for r in github_client.paginate("/user/repos", params=params, prefetch=True):
+            if r['permissions']['push'] and repo_selected(r['full_name'], r.get('archived'), r.get('fork')):
+                names.append(r['full_name'])
+    except requests.RequestException:
+        print("❌ Failed to fetch repos")
+        # Never cache a partial listing
+        return names
+    if use_cache:
+        _store_cached_repos(names)
+    return names
 
 
 def get_user_prs(repo, target_user):
@@ -59,15 +324,231 @@ def get_user_prs(repo, target_user):
     Returns:
         list[dict]: List of pull request dictionaries.
     """
-    url = f"https://api.github.com/repos/{repo}/pulls?state=open"
-    response = requests.get(url, headers=HEADERS, timeout=REQUESTS_TIMEOUT)
-    if response.status_code != 200:
+    try:
+        prs = github_client.paginate(f"/repos/{repo}/pulls", params={"state": "open", "per_page": 100})
+        return [pr for pr in prs if pr['user']['login'] == target_user]
+    except requests.RequestException:
         print(f"❌ Failed to fetch PRs for {repo}")
         return []
-    return [pr for pr in response.json() if pr['user']['login'] == target_user]
 
 
-def merge_pr(repo, pr, target_user):
+def discover_prs(repos, target_user, workers=DISCOVERY_WORKERS):
+    """
+    Fetches open pull requests by a specific user for many repositories concurrently.
+
+    Args:
+        repos (list[str]): Full repository names.
+        target_user (str): GitHub username or bot account.
+        workers (int): Maximum number of concurrent requests.
+
+    Returns:
+        list[tuple[str, list[dict]]]: (repo, prs) pairs in the same order as repos.
+    """
+    workers = max(1, min(workers, len(repos) or 1))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda repo: get_user_prs(repo, target_user), repos)
+        return list(zip(repos, results))
+
+
+def _graphql_author_login(node):
+    author = node.get("author") or {}
+    login = author.get("login", "")
+    # GraphQL reports bots without the '[bot]' suffix REST uses
+    if author.get("__typename") == "Bot":
+        login = f"{login}[bot]"
+    return login
+
+
+def _graphql_pr(node):
+    """
+    Converts a GraphQL pull request node into the REST-shaped dict merge_pr expects.
+    """
+    return {
+        "number": node["number"],
+        "title": node["title"],
+        "html_url": node["url"],
+        "user": {"login": _graphql_author_login(node)},
+        "head": {"sha": node.get("headRefOid")},
+        "base": {
+            "sha": node.get("baseRefOid"),
+            "ref": node.get("baseRefName"),
+            # Current tip of the base branch, see _base_tip
+            "tip": ((node.get("baseRef") or {}).get("target") or {}).get("oid"),
+        },
+        "mergeable": GRAPHQL_MERGEABLE.get(node.get("mergeable")),
+        "mergeable_state": (node.get("mergeStateStatus") or "unknown").lower(),
+    }
+
+
+def _graphql_remaining_prs(repo, cursor):
+    owner, name = repo.split("/", 1)
+    nodes = []
+    while cursor:
+        data = github_client.graphql(REPO_PRS_QUERY, {"owner": owner, "name": name, "cursor": cursor})
+        if not data or not data.get("repository"):
+            print(f"❌ Failed to fetch remaining PRs for {repo}")
+            break
+        connection = data["repository"]["pullRequests"]
+        nodes.extend(connection["nodes"])
+        page_info = connection["pageInfo"]
+        cursor = page_info["endCursor"] if page_info["hasNextPage"] else None
+    return nodes
+
+
+def discover_prs_graphql(target_user):
+    """
+    Fetches pushable repositories, their open PRs by a specific user and each
+    PR's mergeability in a few paginated GraphQL queries.
+
+    Args:
+        target_user (str): GitHub username or bot account (e.g., 'dependabot[bot]').
+
+    Returns:
+        list[tuple[str, list[dict]]]: (repo, prs) pairs for every pushable repository.
+    """
+    repo_prs = []
+    cursor = None
+    affiliations = [a.strip().upper() for a in REPO_AFFILIATION.split(",") if a.strip()]
+    variables = {
+        # ownerAffiliations defaults to [OWNER, COLLABORATOR]; match the REST listing
+        "affiliations": affiliations,
+        "ownerAffiliations": affiliations,
+        "privacy": None if REPO_VISIBILITY == "all" else REPO_VISIBILITY.upper(),
+    }
+    while True:
+        data = github_client.graphql(REPOS_QUERY, {**variables, "cursor": cursor})
+        if not data:
+            print("❌ Failed to fetch repos")
+            break
+        connection = data["viewer"]["repositories"]
+        for repo in connection["nodes"]:
+            if repo.get("viewerPermission") not in PUSH_PERMISSIONS:
+                continue
+            name = repo["nameWithOwner"]
+            if not repo_selected(name, repo.get("isArchived"), repo.get("isFork")):
+                continue
+            pulls = repo["pullRequests"]
+            nodes = pulls["nodes"]
+            if pulls["pageInfo"]["hasNextPage"]:
+                nodes += _graphql_remaining_prs(name, pulls["pageInfo"]["endCursor"])
+            prs = [_graphql_pr(node) for node in nodes]
+            repo_prs.append((name, [pr for pr in prs if pr["user"]["login"] == target_user]))
+        if not connection["pageInfo"]["hasNextPage"]:
+            break
+        cursor = connection["pageInfo"]["endCursor"]
+    return repo_prs
+
+
+def search_author_qualifier(target_user):
+    """
+    Builds the search 'author:' qualifier; bots are addressed as 'app/<name>'.
+    """
+    if target_user.endswith("[bot]"):
+        return f"author:app/{target_user[:-len('[bot]')]}"
+    return f"author:{target_user}"
+
+
+def has_push_access(repo):
+    """
+    Checks whether the authenticated user can push to a repository and the
+    repository passes the archived/fork filters.
+    """
+    try:
+        response = github_client.get(f"/repos/{repo}")
+    except requests.RequestException:
+        response = None
+    if response is None or response.status_code != 200:
+        print(f"❌ Failed to fetch permissions for {repo}")
+        return False
+    data = response.json()
+    if not data.get("permissions", {}).get("push"):
+        return False
+    return repo_selected(repo, data.get("archived"), data.get("fork"))
+
+
+def search_owners():
+    """
+    Owners whose repositories the search backend covers: AUTO_MERGE_OWNERS,
+    or else the user plus the organisations from /user/orgs when
+    AUTO_MERGE_AFFILIATION includes organization_member, like the REST
+    repository listing.
+    """
+    if SEARCH_OWNERS:
+        return SEARCH_OWNERS
+    owners = [GITHUB_USER]
+    if "organization_member" in REPO_AFFILIATION:
+        try:
+            owners += [org["login"] for org in github_client.paginate("/user/orgs", params={"per_page": 100})]
+        except requests.RequestException as e:
+            print(f"⚠️ Failed to list organisations ({e}); searching {GITHUB_USER}'s repositories only")
+    return owners
+
+
+def discover_prs_search(target_user, owners=None, workers=DISCOVERY_WORKERS):
+    """
+    Finds candidate PRs with a single paginated search query, then checks push
+    permission only for the repositories that appear in the results.
+
+    Args:
+        target_user (str): GitHub username or bot account (e.g., 'dependabot[bot]').
+        owners (list[str], optional): Users/orgs whose repositories are searched.
+        workers (int): Maximum number of concurrent permission checks.
+
+    Returns:
+        list[tuple[str, list[dict]]]: (repo, prs) pairs for pushable repositories.
+    """
+    owners = owners or search_owners()
+    query = " ".join(["is:pr", "is:open", search_author_qualifier(target_user)] + [f"user:{owner}" for owner in owners])
+    items = []
+    try:
+        params = {"q": query, "per_page": 100}
+        for item in github_client.paginate("/search/issues", params=params, items_key="items", max_items=SEARCH_LIMIT):
+            items.append(item)
+    except requests.RequestException as e:
+        print(f"❌ Failed to search PRs: {e}")
+    if len(items) >= SEARCH_LIMIT:
+        print(f"⚠️ Search returned {SEARCH_LIMIT}+ PRs; results may be incomplete")
+
+    by_repo = {}
+    for item in items:
+        # repository_url: https://api.github.com/repos/owner/repo
+        repo = "/".join(item["repository_url"].split("/")[-2:])
+        if not repo_selected(repo):
+            continue
+        by_repo.setdefault(repo, []).append(item)
+
+    repos = sorted(by_repo)
+    if not repos:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(repos)))) as executor:
+        pushable = list(executor.map(has_push_access, repos))
+    return [(repo, by_repo[repo]) for repo, allowed in zip(repos, pushable) if allowed]
+
+
+def print_phase_times(phases):
+    """
+    Prints the wall time spent in each phase of the run.
+
+    Args:
+        phases (dict[str, float]): Phase name -> duration in seconds.
+    """
+    print("\n⏱️ Phase timings:")
+    for name, seconds in phases.items():
+        print(f"  {name}: {seconds:.2f}s")
+
+
+def _merged_upstream(repo, pr_number):
+    """
+    Check whether a PR is merged, after a merge request whose outcome is unknown.
+    """
+    try:
+        response = github_client.get(f"/repos/{repo}/pulls/{pr_number}", cache=False)
+    except requests.RequestException:
+        return False
+    return response.status_code == 200 and response.json().get("merged") is True
+
+
+def merge_pr(repo, pr, target_user, allow_defer=False, base_tips=None):
     """
     Attempts to auto-merge a pull request if it is mergeable.
 
@@ -75,6 +556,13 @@ def merge_pr(repo, pr, target_user):
         repo (str): Full repository name.
         pr (dict): Pull request data.
         target_user (str): Username used in commit title.
+        allow_defer (bool): Leave PRs whose mergeability GitHub is still
+            computing (mergeable=null) undecided instead of reporting them.
+        base_tips (dict, optional): Base branch tips of the repository, shared
+            by the PRs merged in one go (see _base_tip).
+
+    Returns:
+        bool: False if the PR was deferred, True once it has an outcome.
 
     Side Effects:
         Updates global merged_prs or unmerged_prs lists with the outcome.
@@ -82,70 +570,206 @@ def merge_pr(repo, pr, target_user):
     pr_number = pr['number']
     pr_title = pr['title']
     pr_url = pr['html_url']
+    if base_tips is None:
+        base_tips = {}
     print(f"🔄 Attempting to merge PR #{pr_number} - {pr_title} in {repo}")
 
-    details_url = f"https://api.github.com/repos/{repo}/pulls/{pr_number}"
-    details = requests.get(details_url, headers=HEADERS, timeout=REQUESTS_TIMEOUT).json()
+    # A merge conflict only depends on head and base; reuse it while both are unchanged
+    previous = _unchanged_conflict(repo, pr, base_tips)
+    if previous:
+        print(f"⏭️ PR #{pr_number} is not mergeable: Merge conflict (unchanged since last run)")
+        unmerged_prs.append((repo, pr_number, pr_title, pr_url, "Merge conflict"))
+        with state_lock:
+            current_state[f"{repo}#{pr_number}"] = previous
+        return True
+
+    # Only a tip known before the verdict may be stored with it
+    base_sha = _base_tip(repo, pr, base_tips, fetch=False)
+
+    # PRs discovered through GraphQL already carry their mergeability
+    details = pr
+    if pr.get('mergeable') is None:
+        details_url = f"/repos/{repo}/pulls/{pr_number}"
+        try:
+            response = github_client.get(details_url)
+            error = None if response.status_code == 200 else f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            error = str(e)
+        if error:
+            # An error body has no 'mergeable'; report it rather than re-polling it
+            print(f"❌ Failed to fetch PR #{pr_number} in {repo}: {error}")
+            unmerged_prs.append((repo, pr_number, pr_title, pr_url, f"Failed to fetch PR details ({error})"))
+            _remember(repo, pr, pr, "failed")
+            return True
+        details = response.json()
+        base_sha = base_sha or _base_tip(repo, details, base_tips, fetch=False)
+
+    if details.get('mergeable') is None and allow_defer:
+        print(f"⏳ PR #{pr_number} in {repo}: mergeability still being computed, re-checking later")
+        return False
 
     if details.get('mergeable') is not True:
         reason = details.get('mergeable_state', 'unknown')
         reason_msg = "Merge conflict" if reason == "dirty" else f"Not mergeable ({reason})"
         print(f"⏭️ PR #{pr_number} is not mergeable: {reason_msg}")
         unmerged_prs.append((repo, pr_number, pr_title, pr_url, reason_msg))
-        return
+        outcome = "conflict" if details.get('mergeable') is False else "unmergeable"
+        _remember(repo, pr, details, outcome, base_sha)
+        return True
 
-    merge_url = f"https://api.github.com/repos/{repo}/pulls/{pr_number}/merge"
+    merge_url = f"/repos/{repo}/pulls/{pr_number}/merge"
     data = {
         "merge_method": MERGE_METHOD,
         "commit_title": f"Auto-merge PR #{pr_number}: {pr_title}"
     }
-    response = requests.put(merge_url, headers=HEADERS, json=data, timeout=REQUESTS_TIMEOUT)
-
-    if response.status_code == 200:
+    merged = False
+    error = None
+    for attempt in range(MERGE_RETRIES):
+        try:
+            response = github_client.put(merge_url, json=data)
+        except requests.RequestException as e:
+            response = None
+            error = str(e)
+        if response is not None and response.status_code == 200:
+            merged = True
+            break
+        # The previous merge in this repo may still be settling on the base branch
+        if response is not None and response.status_code == 405 and "base branch was modified" in response.text.lower():
+            time.sleep(2 ** attempt)
+            continue
+        if response is None or response.status_code >= 500:
+            # The merge may have gone through even though its reply was lost
+            merged = _merged_upstream(repo, pr_number)
+        break
+
+    if merged:
         print(f"✅ Merged PR #{pr_number} - {pr_title} in {repo}")
         merged_prs.append((repo, pr_number, pr_title, pr_url))
+        _remember(repo, pr, details, "merged")
+        # The merge moved the base branch
+        base_ref = (details.get("base") or pr.get("base") or {}).get("ref")
+        if base_ref:
+            base_tips[base_ref] = None
     else:
-        error = response.json().get('message', 'Unknown error')
+        if response is not None:
+            try:
+                error = response.json().get('message', 'Unknown error')
+            except ValueError:
+                error = f"HTTP {response.status_code}"
         print(f"❌ Failed to merge PR #{pr_number} - {pr_title} in {repo}: {error}")
         unmerged_prs.append((repo, pr_number, pr_title, pr_url, error))
+        _remember(repo, pr, details, "failed")
+    return True
+
+
+def merge_repo_prs(repo, prs, target_user, allow_defer=True):
+    """
+    Merges the pull requests of a single repository one after another.
+
+    Each merge moves the base branch, so merges within one repository
+    are never run concurrently.
+
+    Returns:
+        list[dict]: PRs deferred because their mergeability is not known yet.
+    """
+    base_tips = {}
+    return [pr for pr in prs if not merge_pr(repo, pr, target_user, allow_defer, base_tips)]
+
+
+def run_merges(repo_prs, target_user, workers=MERGE_WORKERS, repoll_attempts=REPOLL_ATTEMPTS):
+    """
+    Merges pull requests in parallel across repositories, serially within each.
+
+    Pacing comes from GitHub's rate-limit feedback handled by github_client
+    rather than a fixed delay between merges.
+
+    PRs whose mergeability GitHub is still computing are put on a re-check
+    queue with exponential backoff and revisited later in the same run,
+    while merges in other repositories carry on. After repoll_attempts
+    re-checks they are reported as not mergeable.
+
+    Args:
+        repo_prs (list[tuple[str, list[dict]]]): (repo, prs) pairs.
+        target_user (str): Username used in commit title.
+        workers (int): Maximum number of repositories merged concurrently.
+        repoll_attempts (int): Re-checks for PRs with unknown mergeability.
+    """
+    pending = [(repo, prs) for repo, prs in repo_prs if prs]
+    if not pending:
+        return
+    workers = max(1, min(workers, len(pending)))
+    deferred = []  # heap of (due, seq, repo, pr, attempt)
+    sequence = itertools.count()
+    running = {}  # future -> (repo, attempt)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for repo, prs in pending:
+            running[executor.submit(merge_repo_prs, repo, prs, target_user, repoll_attempts > 0)] = (repo, 0)
+
+        while running or deferred:
+            timeout = max(deferred[0][0] - time.monotonic(), 0) if deferred else None
+            if running:
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(timeout)
+                done = set()
+
+            for future in done:
+                repo, attempt = running.pop(future)
+                for pr in future.result():
+                    due = time.monotonic() + REPOLL_DELAY * 2 ** attempt
+                    heapq.heappush(deferred, (due, next(sequence), repo, pr, attempt + 1))
+
+            # Re-check due PRs, but never while their repository is merging
+            busy = {repo for repo, _ in running.values()}
+            now = time.monotonic()
+            while deferred and deferred[0][0] <= now:
+                _, _, repo, pr, attempt = heapq.heappop(deferred)
+                if repo in busy:
+                    heapq.heappush(deferred, (now + BUSY_REPO_DELAY, next(sequence), repo, pr, attempt))
+                    continue
+                allow_defer = attempt < repoll_attempts
+                running[executor.submit(merge_repo_prs, repo, [pr], target_user, allow_defer)] = (repo, attempt)
+                busy.add(repo)
+
+    # Keep report order stable: repository order first, merge order within a repo
+    order = {repo: index for index, (repo, _) in enumerate(repo_prs)}
+    merged_prs.sort(key=lambda item: order[item[0]])
+    unmerged_prs.sort(key=lambda item: order[item[0]])
 
 
 def build_and_send_email(user):
     """
-    Builds an HTML report and sends it via email for merged/unmerged PRs.
+    Builds an HTML report and queues it for email delivery for merged/unmerged PRs.
 
     Args:
         user (str): GitHub username the report is for.
     """
     subject = f"[Auto-Merge] {len(unmerged_prs)} unmerged, {len(merged_prs)} merged for {user}"
 
-    body = ""
+    report = ReportBuilder(title="Auto-Merge Report", github_user=GITHUB_USER)
     if merged_prs:
-        body += "<h3>Merged PRs</h3><ul>"
+        report.section("Merged PRs", len(merged_prs))
+        report.begin_list()
         for repo, pr_number, title, url in merged_prs:
-            body += f'<li><a href="{url}">{repo}#{pr_number}</a>: {title}</li>'
-        body += "</ul>"
+            report.item(url, f"{repo}#{pr_number}", f": {title}")
+        report.end_list()
 
     if unmerged_prs:
-        body += "<h3>Unmerged PRs</h3><ul>"
+        report.section("Unmerged PRs", len(unmerged_prs))
+        report.begin_list()
         for repo, pr_number, title, url, reason in unmerged_prs:
-            body += f'<li><a href="{url}">{repo}#{pr_number}</a>: {title} — {reason}</li>'
-        body += "</ul>"
+            report.item(url, f"{repo}#{pr_number}", f": {title} — {reason}")
+        report.end_list()
 
     if not merged_prs and not unmerged_prs:
-        body = f"<p>All PRs from {user} were merged successfully! 🎉</p>"
+        report.empty(f"All PRs from {user} were merged successfully! 🎉")
 
-    html_report = wrap_html_report(
-        content_html=body,
-        title="Auto-Merge Report",
-        github_user=GITHUB_USER
-    )
-    send_email_report(subject, html_report)
+    queue_email_report(subject, report.finish())
 
 
 def build_and_send_telegram(user):
     """
-    Sends a summary of merged/unmerged PRs via Telegram.
+    Queues a summary of merged/unmerged PRs via Telegram.
 
     Args:
         user (str): GitHub username the report is for.
@@ -162,7 +786,7 @@ def build_and_send_telegram(user):
         if unmerged:
             text += f"\n\n*Unmerged PRs:*\n{unmerged}"
 
-    send_telegram_report(text)
+    queue_telegram_report(text)
 
 
 def main():
@@ -178,24 +802,79 @@ def main():
         default=os.getenv("AUTO_MERGE_USER", "dependabot[bot]"),
         help="GitHub username to auto-merge PRs for"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DISCOVERY_WORKERS,
+        help="Number of repositories to query concurrently during PR discovery"
+    )
+    parser.add_argument(
+        "--merge-workers",
+        type=int,
+        default=MERGE_WORKERS,
+        help="Number of repositories to merge in parallel (merges within a repository stay sequential)"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["rest", "graphql", "search"],
+        default=DISCOVERY_BACKEND,
+        help="API used to discover repositories and candidate PRs"
+    )
+    parser.add_argument(
+        "--repoll-attempts",
+        type=int,
+        default=REPOLL_ATTEMPTS,
+        help="How often to re-check PRs whose mergeability GitHub is still computing"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-evaluate every PR and refresh the repository list instead of reusing state from earlier runs"
+    )
     args = parser.parse_args()
     target_user = args.user
-
-    repos = get_repos()
-    print(f"📦 Found {len(repos)} repositories")
-    for repo in repos:
-        prs = get_user_prs(repo, target_user)
-        if prs:
-            processed_prs.extend(prs)
-        for pr in prs:
-            merge_pr(repo, pr, target_user)
-            time.sleep(1)
-
+    phases = {}
+    if not args.full:
+        previous_state.update(load_state(target_user))
+
+    if args.backend == "graphql":
+        started = time.monotonic()
+        repo_prs = discover_prs_graphql(target_user)
+        phases["GraphQL discovery"] = time.monotonic() - started
+        print(f"📦 Found {len(repo_prs)} repositories")
+    elif args.backend == "search":
+        started = time.monotonic()
+        repo_prs = discover_prs_search(target_user, workers=args.workers)
+        phases["Search discovery"] = time.monotonic() - started
+        print(f"📦 Found {len(repo_prs)} repositories with open PRs from {target_user}")
+    else:
+        started = time.monotonic()
+        repos = get_repos(use_cache=not args.full)
+        phases["Repository listing"] = time.monotonic() - started
+        print(f"📦 Found {len(repos)} repositories")
+
+        started = time.monotonic()
+        repo_prs = discover_prs(repos, target_user, args.workers)
+        phases["PR discovery"] = time.monotonic() - started
+
+    started = time.monotonic()
+    for _, prs in repo_prs:
+        processed_prs.extend(prs)
+    run_merges(repo_prs, target_user, args.merge_workers, args.repoll_attempts)
+    # Only PRs seen in this run are kept, so closed PRs drop out of the state
+    save_state(target_user, current_state)
+    phases["Merging"] = time.monotonic() - started
+
+    started = time.monotonic()
     if processed_prs:
         build_and_send_email(target_user)
         build_and_send_telegram(target_user)
     else:
         print(f"📭 No PRs from {target_user} found — skipping notifications.")
+    phases["Notifications"] = time.monotonic() - started
+
+    print_phase_times(phases)
+    github_client.print_call_stats()
 
 
 if __name__ == '__main__':
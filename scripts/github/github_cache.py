@@ -0,0 +1,154 @@
+# github_cache.py
+
+import hashlib
+import json
+import os
+import threading
+
+# === Cache Config ===
+CACHE_DIR = os.getenv("GITHUB_CACHE_DIR", "/var/log/github-scripts/cache/http")
+try:
+    CACHE_MAX_BYTES = int(float(os.getenv("GITHUB_CACHE_MAX_MB", 50)) * 1024 * 1024)
+except ValueError:
+    print("⚠️ Invalid GITHUB_CACHE_MAX_MB, using default 50")
+    CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Response headers worth replaying alongside a cached body
+REPLAYED_HEADERS = ("Content-Type", "Link")
+
+_lock = threading.Lock()
+_total_bytes = None
+
+
+def is_enabled():
+    return CACHE_MAX_BYTES > 0
+
+
+def cache_key(url, auth=""):
+    """
+    Build the cache key for a URL. The auth header is folded in so that
+    responses fetched with one token are never replayed for another.
+    """
+    return hashlib.sha256(f"{auth}\n{url}".encode("utf-8")).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def _scan_total():
+    total = 0
+    try:
+        with os.scandir(CACHE_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    total += entry.stat().st_size
+    except FileNotFoundError:
+        pass
+    return total
+
+
+def lookup(key):
+    """
+    Return the cached entry for a key and mark it as recently used.
+
+    Returns:
+        dict or None: {url, etag, last_modified, headers, body} if cached.
+    """
+    if not is_enabled():
+        return None
+    path = _entry_path(key)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        os.utime(path)
+        return entry
+    except (FileNotFoundError, json.JSONDecodeError, OSError):
+        return None
+
+
+def conditional_headers(entry):
+    """
+    Return the If-None-Match / If-Modified-Since headers for a cached entry.
+    """
+    headers = {}
+    if not entry:
+        return headers
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def store(key, url, response):
+    """
+    Persist a 200 response if it carries a validator (ETag or Last-Modified).
+
+    Args:
+        key (str): Cache key from cache_key().
+        url (str): Request URL, kept for debugging.
+        response (requests.Response): The response to cache.
+    """
+    global _total_bytes
+    if not is_enabled():
+        return
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+
+    entry = {
+        "url": url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "headers": {h: response.headers[h] for h in REPLAYED_HEADERS if h in response.headers},
+        "body": response.text,
+    }
+    data = json.dumps(entry).encode("utf-8")
+    if len(data) > CACHE_MAX_BYTES:
+        return
+
+    path = _entry_path(key)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with _lock:
+            if _total_bytes is None:
+                _total_bytes = _scan_total()
+            try:
+                _total_bytes -= os.path.getsize(path)
+            except OSError:
+                pass
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            _total_bytes += len(data)
+            if _total_bytes > CACHE_MAX_BYTES:
+                _evict()
+    except OSError as e:
+        print(f"⚠️ Failed to write response cache entry: {e}")
+
+
+def _evict():
+    """
+    Remove least recently used entries until the cache fits its size cap.
+    Must be called with _lock held.
+    """
+    global _total_bytes
+    entries = []
+    with os.scandir(CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()
+    _total_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if _total_bytes <= CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            _total_bytes -= size
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,414 @@
+# github_client.py
+
+import os
+import re
+import json
+import atexit
+import bisect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import github_cache
+import rate_limiter
+
+# === GitHub API Config ===
+# Overridable for GitHub Enterprise or the local fake API used by the benchmarks
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+REQUESTS_TIMEOUT = 10
+try:
+    POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", 10))
+except ValueError:
+    print("⚠️ Invalid GITHUB_POOL_SIZE, using default 10")
+    POOL_SIZE = 10
+try:
+    MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", 5))
+except ValueError:
+    print("⚠️ Invalid GITHUB_MAX_RETRIES, using default 5")
+    MAX_RETRIES = 5
+RETRY_STATUSES = {500, 502, 503, 504}
+# Methods that are safe to send again after a lost reply or a 5xx
+IDEMPOTENT_METHODS = {"GET", "HEAD"}
+# Upper bounds (seconds) of the per-endpoint latency histogram
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Set by cron_wrapper and the dashboard to collect this run's API metrics
+METRICS_FILE = os.getenv("GITHUB_METRICS_FILE")
+
+HEADERS = {
+    "Authorization": f"token {GITHUB_TOKEN}",
+    "Accept": "application/vnd.github+json",
+    "User-Agent": "github-scripts-bot"
+}
+
+_session = None
+_session_lock = threading.Lock()
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the shared keep-alive session used for every GitHub API call.
+
+    The session is created lazily and reuses pooled connections to
+    the API host, so only the first call per connection pays for the
+    TCP and TLS handshake.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(HEADERS)
+                _session = session
+    return _session
+
+
+def api_url(path):
+    """
+    Build an absolute GitHub API URL from a path such as '/user/repos'.
+    """
+    if path.startswith("http"):
+        return path
+    return f"{GITHUB_API_URL}/{path.lstrip('/')}"
+
+
+def endpoint_name(method, url):
+    """
+    Collapse a request URL into a stable endpoint label for accounting.
+
+    Example:
+        PUT https://api.github.com/repos/a/b/pulls/7/merge
+        -> 'PUT /repos/{repo}/pulls/{number}/merge'
+    """
+    path = urlsplit(url).path
+    path = re.sub(r"^/repos/[^/]+/[^/]+", "/repos/{repo}", path)
+    path = re.sub(r"/\d+(?=/|$)", "/{number}", path)
+    return f"{method.upper()} {path}"
+
+
+def _record(endpoint, elapsed, status_code, size=0):
+    with _stats_lock:
+        entry = _stats.get(endpoint)
+        if entry is None:
+            entry = _stats[endpoint] = {
+                "calls": 0, "errors": 0, "retries": 0, "cache_hits": 0, "bytes": 0,
+                "total": 0.0, "max": 0.0, "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+            }
+        entry["calls"] += 1
+        entry["bytes"] += size
+        entry["total"] += elapsed
+        entry["max"] = max(entry["max"], elapsed)
+        entry["buckets"][bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+        if status_code == 304:
+            entry["cache_hits"] += 1
+        elif status_code is None or status_code >= 400:
+            entry["errors"] += 1
+
+
+def _record_retry(endpoint):
+    with _stats_lock:
+        _stats[endpoint]["retries"] += 1
+
+
+def _with_params(url, params):
+    prepared = requests.models.PreparedRequest()
+    prepared.prepare_url(url, params)
+    return prepared.url
+
+
+def _replay(response, cached):
+    """
+    Turn a 304 Not Modified response into a 200 carrying the cached body.
+    Rate-limit headers from the live 304 response are kept.
+    """
+    response.status_code = 200
+    response._content = cached["body"].encode("utf-8")
+    response.encoding = "utf-8"
+    response.headers.update(cached.get("headers", {}))
+    response.from_cache = True
+    return response
+
+
+def request(method, url, cache=True, idempotent=None, **kwargs):
+    """
+    Perform a GitHub API request on the shared session.
+
+    Each call takes a token from the rate-limit bucket it is charged to
+    (core, search or graphql), which only slows down once quota runs low.
+    Rate-limited (403/429) responses are retried honouring Retry-After;
+    GitHub has not processed those. 5xx responses and connection errors
+    are retried with jittered exponential backoff only for idempotent
+    requests, since a write such as a merge may have been applied even
+    though its reply was lost.
+
+    GET requests are made conditional when a cached copy exists; a 304
+    reply is replayed from the on-disk cache (see github_cache) and does
+    not count against the rate limit.
+
+    Args:
+        method (str): HTTP method (e.g., 'GET', 'PUT').
+        url (str): Absolute URL or API path.
+        cache (bool): Use the conditional response cache for GET requests.
+        idempotent (bool, optional): Whether the request may be sent again
+            after a 5xx or connection error; defaults to True for GET/HEAD.
+        **kwargs: Passed through to requests.Session.request.
+
+    Returns:
+        requests.Response: The response of the last attempt.
+    """
+    url = api_url(url)
+    params = kwargs.pop("params", None)
+    if params:
+        url = _with_params(url, params)
+    kwargs.setdefault("timeout", REQUESTS_TIMEOUT)
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+    endpoint = endpoint_name(method, url)
+    resource = rate_limiter.resource_for(url)
+    bucket = rate_limiter.get_bucket(resource)
+
+    cached = None
+    cache_key = None
+    if cache and method.upper() == "GET" and github_cache.is_enabled():
+        cache_key = github_cache.cache_key(url, HEADERS["Authorization"])
+        cached = github_cache.lookup(cache_key)
+        if cached:
+            kwargs["headers"] = {**github_cache.conditional_headers(cached), **kwargs.get("headers", {})}
+
+    for attempt in range(MAX_RETRIES + 1):
+        bucket.acquire()
+        started = time.monotonic()
+        response = None
+        status_code = None
+        size = 0
+        try:
+            response = get_session().request(method, url, **kwargs)
+            status_code = response.status_code
+            size = len(response.content)
+        except requests.RequestException as e:
+            if attempt >= MAX_RETRIES or not idempotent:
+                raise
+            error = e
+        finally:
+            _record(endpoint, time.monotonic() - started, status_code, size)
+
+        if response is not None:
+            rate_limiter.update_from_response(response, resource)
+            wait = rate_limiter.retry_after_seconds(response)
+            retryable = idempotent and status_code in RETRY_STATUSES
+            if (wait is None and not retryable) or attempt >= MAX_RETRIES:
+                break
+            if wait is not None:
+                # Primary limits only affect their own bucket, secondary limits the whole account
+                exhausted = response.headers.get("X-RateLimit-Remaining") == "0"
+                print(f"⏳ Rate limited on {endpoint}, retrying in {wait:.0f}s")
+                rate_limiter.pause(wait, resource if exhausted else None)
+            else:
+                delay = rate_limiter.backoff_delay(attempt)
+                print(f"⚠️ {endpoint} returned {status_code}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+        else:
+            delay = rate_limiter.backoff_delay(attempt)
+            print(f"⚠️ {endpoint} failed ({error}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+        _record_retry(endpoint)
+
+    response.from_cache = False
+    if cache_key:
+        if status_code == 304 and cached:
+            return _replay(response, cached)
+        if status_code == 200:
+            github_cache.store(cache_key, url, response)
+    return response
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def put(url, **kwargs):
+    return request("PUT", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def paginate(url, params=None, items_key=None, max_items=None, prefetch=False):
+    """
+    Stream the items of a paginated GitHub list or search endpoint.
+
+    Pages are followed through the Link: rel="next" header, so no request
+    is wasted on an empty trailing page, and items are yielded as soon as
+    their page arrives.
+
+    Args:
+        url (str): Absolute URL or API path of the first page.
+        params (dict, optional): Query parameters for the first page.
+        items_key (str, optional): Key holding the items (e.g., 'items' for search);
+            the response body itself is the item list when omitted.
+        max_items (int, optional): Stop after yielding this many items.
+        prefetch (bool): Fetch the next page in the background while the
+            current one is being consumed.
+
+    Yields:
+        dict: One item at a time.
+
+    Raises:
+        requests.HTTPError: If a page cannot be fetched.
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    pending = None
+    count = 0
+    try:
+        response = get(url, params=params)
+        while True:
+            response.raise_for_status()
+            data = response.json()
+            items = data.get(items_key, []) if items_key else data
+            next_url = response.links.get("next", {}).get("url")
+            if max_items is not None and count + len(items) >= max_items:
+                next_url = None
+            if next_url and executor:
+                pending = executor.submit(get, next_url)
+
+            for item in items:
+                yield item
+                count += 1
+                if max_items is not None and count >= max_items:
+                    return
+
+            if not next_url:
+                return
+            response = pending.result() if pending else get(next_url)
+            pending = None
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def graphql(query, variables=None):
+    """
+    Run a GraphQL query against the GitHub API.
+
+    Args:
+        query (str): GraphQL query document.
+        variables (dict, optional): Query variables.
+
+    Returns:
+        dict or None: The 'data' member of the reply, or None on failure.
+    """
+    # Only queries are sent, so retrying after a lost reply is safe
+    response = post("/graphql", json={"query": query, "variables": variables or {}}, idempotent=True)
+    if response.status_code != 200:
+        print(f"❌ GraphQL request failed ({response.status_code}): {response.text[:200]}")
+        return None
+    payload = response.json()
+    if payload.get("errors"):
+        messages = "; ".join(error.get("message", "") for error in payload["errors"])
+        print(f"❌ GraphQL errors: {messages}")
+        if not payload.get("data"):
+            return None
+    return payload.get("data")
+
+
+def get_call_stats():
+    """
+    Return a snapshot of per-endpoint call counts and latencies.
+
+    Returns:
+        dict[str, dict]: Endpoint label -> {calls, errors, retries, cache_hits,
+        bytes, total, max, buckets}, where buckets counts calls per
+        LATENCY_BUCKETS bound plus a final overflow bucket.
+    """
+    with _stats_lock:
+        return {endpoint: {**entry, "buckets": list(entry["buckets"])} for endpoint, entry in _stats.items()}
+
+
+def get_run_metrics():
+    """
+    Return the API metrics of this process in the shape stored in run history.
+
+    Returns:
+        dict: {calls, errors, retries, cache_hits, bytes, latency_buckets,
+        endpoints, rate_limits}.
+    """
+    endpoints = get_call_stats()
+    totals = {
+        key: sum(entry[key] for entry in endpoints.values())
+        for key in ("calls", "errors", "retries", "cache_hits", "bytes")
+    }
+    rate_limits = {
+        name: bucket.snapshot()
+        for name, bucket in sorted(rate_limiter.all_buckets().items())
+        if bucket.seen
+    }
+    return {
+        **totals,
+        "latency_buckets": list(LATENCY_BUCKETS),
+        "endpoints": {
+            endpoint: {**entry, "total": round(entry["total"], 4), "max": round(entry["max"], 4)}
+            for endpoint, entry in endpoints.items()
+        },
+        "rate_limits": rate_limits,
+    }
+
+
+def write_run_metrics(path=METRICS_FILE):
+    """
+    Write get_run_metrics() as JSON for the process that started this script.
+    Registered to run at exit when GITHUB_METRICS_FILE is set.
+    """
+    if not path or not _stats:
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(get_run_metrics(), f)
+    except OSError as e:
+        print(f"⚠️ Failed to write API metrics: {e}")
+
+
+if METRICS_FILE:
+    atexit.register(write_run_metrics)
+
+
+def print_call_stats():
+    """
+    Print a per-endpoint summary of API calls and latency.
+    """
+    stats = get_call_stats()
+    if not stats:
+        return
+    total_calls = sum(entry["calls"] for entry in stats.values())
+    total_time = sum(entry["total"] for entry in stats.values())
+    total_hits = sum(entry["cache_hits"] for entry in stats.values())
+    total_retries = sum(entry["retries"] for entry in stats.values())
+    total_bytes = sum(entry["bytes"] for entry in stats.values())
+    print(
+        f"\n📊 GitHub API: {total_calls} calls ({total_hits} not modified, {total_retries} retries), "
+        f"{total_time:.2f}s total, {total_bytes / 1024:.0f} KiB"
+    )
+    for endpoint, entry in sorted(stats.items(), key=lambda item: -item[1]["total"]):
+        avg = entry["total"] / entry["calls"]
+        print(
+            f"  {endpoint}: {entry['calls']} calls, avg {avg * 1000:.0f}ms, "
+            f"max {entry['max'] * 1000:.0f}ms, 304 {entry['cache_hits']}, "
+            f"retries {entry['retries']}, errors {entry['errors']}"
+        )
+    for name, bucket in sorted(rate_limiter.all_buckets().items()):
+        if not bucket.seen:
+            continue
+        snapshot = bucket.snapshot()
+        print(f"  Rate limit [{name}]: {snapshot['remaining']}/{snapshot['limit']} remaining")
@@ -1,5 +1,13 @@
 import os
+import json
+import time
+import uuid
+import fcntl
+import random
+import argparse
 import smtplib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -14,7 +22,10 @@ except ValueError:
 SMTP_USER = os.getenv("SMTP_USER")
 SMTP_PWD = os.getenv("SMTP_PWD")
 EMAIL_FROM = os.getenv("EMAIL_FROM", SMTP_USER)
-EMAIL_TO = os.getenv("EMAIL_TO")  # Optional default recipient
+EMAIL_TO = os.getenv("EMAIL_TO")  # Optional default recipient(s), comma-separated
+SMTP_TIMEOUT = 30
+# Errors after which the connection is re-established and the message resent once
+SMTP_RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
 
 # === Telegram Config ===
 TELEGRAM_BOT_ID = os.getenv("TELEGRAM_BOT_ID")
@@ -22,61 +33,541 @@ TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 TELEGRAM_WEBHOOK = (
     f"https://api.telegram.org/bot{TELEGRAM_BOT_ID}/sendMessage" if TELEGRAM_BOT_ID else None
 )
+TELEGRAM_MAX_LENGTH = 4096  # Telegram's limit, in UTF-16 code units
+# Telegram allows about one message per second per chat (20 per minute in groups)
+try:
+    TELEGRAM_MIN_INTERVAL = float(os.getenv("TELEGRAM_MIN_INTERVAL", 1.0))
+except ValueError:
+    print("⚠️ Invalid TELEGRAM_MIN_INTERVAL, using default 1.0")
+    TELEGRAM_MIN_INTERVAL = 1.0
+TELEGRAM_MAX_RETRIES = 3
+MARKDOWN_MARKERS = ("`", "*", "_")
+
+_telegram_last_sent = {}
+
+# === Outbox Config ===
+# Notifications are spooled here and delivered by a background flusher
+OUTBOX_DIR = os.getenv("NOTIFY_OUTBOX_DIR", "/var/log/github-scripts/outbox")
+NOTIFY_OUTBOX = os.getenv("NOTIFY_OUTBOX", "true").lower() == "true"
+try:
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", 8))
+except ValueError:
+    print("⚠️ Invalid NOTIFY_MAX_ATTEMPTS, using default 8")
+    OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_BASE = 60
+OUTBOX_RETRY_CAP = 3600
+
+
+class SMTPSession:
+    """
+    One authenticated SMTP connection reused for many messages.
+
+    The connection (including STARTTLS and login) is opened on the first
+    send and re-opened transparently if the server has dropped it.
+
+    Example:
+        with SMTPSession() as session:
+            for msg in messages:
+                session.send(msg)
+    """
+
+    def __init__(self):
+        self._server = None
+
+    def _connect(self):
+        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        try:
+            server.starttls()
+            server.login(SMTP_USER, SMTP_PWD)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+
+    def send(self, msg):
+        """
+        Send a prepared message to the recipients in its To header.
+
+        Raises:
+            smtplib.SMTPException: If the message could not be sent.
+        """
+        recipients = [addr.strip() for addr in msg["To"].split(",") if addr.strip()]
+        for attempt in range(2):
+            if self._server is None:
+                self._connect()
+            try:
+                self._server.sendmail(EMAIL_FROM, recipients, msg.as_string())
+                return
+            except SMTP_RECONNECT_ERRORS:
+                self.close()
+                if attempt:
+                    raise
+                print("⚠️ SMTP connection lost, reconnecting...")
+
+    def close(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            self._server.close()
+        self._server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _build_email(subject, html_body, recipient):
+    msg = MIMEMultipart()
+    msg["From"] = EMAIL_FROM
+    msg["To"] = recipient
+    msg["Subject"] = subject
+    msg.attach(MIMEText(html_body, "html"))
+    return msg
+
+
+def send_email_batch(messages):
+    """
+    Send several HTML emails over a single SMTP session.
+
+    Args:
+        messages (list[tuple]): (subject, html_body, email_to) tuples;
+            email_to may be None to use EMAIL_TO.
+
+    Returns:
+        list[dict]: One result per message, in order:
+            {subject, to, sent (bool), error (str or None)}.
+    """
+    results = []
+    if not all([SMTP_SERVER, SMTP_USER, SMTP_PWD, EMAIL_FROM]):
+        print("⚠️ Skipping email: SMTP config missing.")
+        return [
+            {"subject": subject, "to": email_to or EMAIL_TO, "sent": False, "error": "SMTP config missing"}
+            for subject, _, email_to in messages
+        ]
+
+    with SMTPSession() as session:
+        for subject, html_body, email_to in messages:
+            recipient = email_to or EMAIL_TO
+            result = {"subject": subject, "to": recipient, "sent": False, "error": None}
+            results.append(result)
+            if not recipient:
+                result["error"] = "recipient missing"
+                print(f"⚠️ Skipping email '{subject}': recipient missing.")
+                continue
+            try:
+                session.send(_build_email(subject, html_body, recipient))
+                result["sent"] = True
+                print(f"📧 Email sent to {recipient}")
+            except Exception as e:
+                result["error"] = str(e)
+                print(f"❌ Failed to send email to {recipient}: {e}")
+    return results
 
 
 def send_email_report(subject: str, html_body: str, email_to: str = None):
     """
     Send an HTML email report.
 
+    Each address in a comma-separated recipient list gets its own copy;
+    all copies share one SMTP session.
+
     Args:
         subject (str): Email subject.
         html_body (str): HTML body content.
-        email_to (str, optional): Optional override for recipient.
+        email_to (str, optional): Optional override for recipient(s).
+
+    Returns:
+        bool: True if every copy was sent.
     """
-    recipient = email_to or EMAIL_TO
-    if not all([SMTP_SERVER, SMTP_USER, SMTP_PWD, EMAIL_FROM, recipient]):
+    recipients = [addr.strip() for addr in (email_to or EMAIL_TO or "").split(",") if addr.strip()]
+    if not all([SMTP_SERVER, SMTP_USER, SMTP_PWD, EMAIL_FROM, recipients]):
         print("⚠️ Skipping email: SMTP config or recipient missing.")
-        return
+        return False
+    results = send_email_batch([(subject, html_body, recipient) for recipient in recipients])
+    return all(result["sent"] for result in results)
 
-    msg = MIMEMultipart()
-    msg["From"] = EMAIL_FROM
-    msg["To"] = recipient
-    msg["Subject"] = subject
-    msg.attach(MIMEText(html_body, "html"))
 
-    try:
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PWD)
-            server.sendmail(EMAIL_FROM, recipient, msg.as_string())
-        print(f"📧 Email sent to {recipient}")
-    except Exception as e:
-        print(f"❌ Failed to send email: {e}")
+def _telegram_length(text):
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _split_long_line(line, limit):
+    """
+    Split a single line that does not fit into one message, preferring
+    spaces as break points. Inline Markdown entities that would be cut in
+    half are closed at the end of a piece and reopened in the next one.
+    """
+    pieces = []
+    reopen = ""
+    while line:
+        line = reopen + line
+        if _telegram_length(line) <= limit:
+            pieces.append(line)
+            break
+        cut = limit - len(MARKDOWN_MARKERS)
+        while _telegram_length(line[:cut]) > cut:
+            cut -= 1
+        space = line.rfind(" ", 0, cut)
+        if space > cut // 2:
+            cut = space + 1
+        piece, line = line[:cut], line[cut:]
+        # Legacy Markdown entities cannot nest, so at most one is open here
+        reopen = next((m for m in MARKDOWN_MARKERS if piece.count(m) % 2), "")
+        pieces.append(piece + reopen)
+    return pieces
 
 
-def send_telegram_report(text: str):
+def split_telegram_message(text: str, limit: int = TELEGRAM_MAX_LENGTH):
     """
-    Send a raw text message to Telegram using Markdown formatting.
+    Split a Markdown message into chunks Telegram accepts.
+
+    Chunks are cut on line boundaries; a ``` block spanning two chunks is
+    closed and reopened so that every chunk parses on its own. Only lines
+    longer than a whole message are split inside the line.
 
     Args:
         text (str): Message body (Markdown allowed).
+        limit (int): Maximum chunk length.
+
+    Returns:
+        list[str]: The chunks, in order.
     """
-    if not TELEGRAM_WEBHOOK or not TELEGRAM_CHAT_ID:
-        print("⚠️ Skipping Telegram: config missing.")
-        return
+    if _telegram_length(text) <= limit:
+        return [text]
+
+    fence = "```"
+    reserve = _telegram_length(fence) + 1
+    chunks = []
+    lines = []
+    size = 0
+    in_pre = False
+    for line in text.split("\n"):
+        pieces = [line]
+        if _telegram_length(line) > limit - 2 * reserve:
+            pieces = _split_long_line(line, limit - 2 * reserve)
+        for piece in pieces:
+            piece_size = _telegram_length(piece) + 1
+            if lines and size + piece_size + (reserve if in_pre else 0) > limit:
+                chunks.append("\n".join(lines + ([fence] if in_pre else [])))
+                lines = [fence] if in_pre else []
+                size = reserve if in_pre else 0
+            lines.append(piece)
+            size += piece_size
+            if piece.count(fence) % 2:
+                in_pre = not in_pre
+    if lines:
+        chunks.append("\n".join(lines))
+    return [chunk for chunk in chunks if chunk.strip()]
+
 
+def _post_telegram(chat_id, text, parse_mode="Markdown"):
+    """
+    Post one message, waiting out Telegram's per-chat pacing and any
+    retry_after it asks for.
+
+    Returns:
+        requests.Response or None: The last response, or None if the request failed.
+    """
     payload = {
-        "chat_id": TELEGRAM_CHAT_ID,
+        "chat_id": chat_id,
         "text": text,
-        "parse_mode": "Markdown",
         "disable_web_page_preview": True,
     }
+    if parse_mode:
+        payload["parse_mode"] = parse_mode
+
+    response = None
+    for attempt in range(TELEGRAM_MAX_RETRIES + 1):
+        wait = _telegram_last_sent.get(chat_id, 0) + TELEGRAM_MIN_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            response = requests.post(TELEGRAM_WEBHOOK, json=payload, timeout=10)
+        except requests.RequestException as e:
+            print(f"⚠️ Telegram request failed ({e}), attempt {attempt + 1}")
+            response = None
+            time.sleep(2 ** attempt)
+            continue
+        finally:
+            _telegram_last_sent[chat_id] = time.monotonic()
+
+        if response.status_code != 429:
+            return response
+        try:
+            retry_after = response.json().get("parameters", {}).get("retry_after", 1)
+        except ValueError:
+            retry_after = 1
+        print(f"⏳ Telegram rate limited, retrying in {retry_after}s")
+        time.sleep(retry_after)
+    return response
+
+
+def send_telegram_messages(messages, chat_id: str = None):
+    """
+    Send several Telegram messages in order through a paced queue.
+
+    Messages to the same chat are spaced TELEGRAM_MIN_INTERVAL apart and
+    429 replies are retried after the retry_after Telegram returns. A chunk
+    whose Markdown Telegram cannot parse is resent as plain text rather
+    than dropped. Sending stops at the first message that still fails, so
+    the messages delivered are always a prefix of the input.
+
+    Args:
+        messages (list[str]): Message bodies (Markdown allowed).
+        chat_id (str, optional): Optional override for the target chat.
+
+    Returns:
+        int: Number of leading messages delivered.
+    """
+    chat_id = chat_id or TELEGRAM_CHAT_ID
+    if not TELEGRAM_WEBHOOK or not chat_id:
+        print("⚠️ Skipping Telegram: config missing.")
+        return 0
+
+    queue = deque(messages)
+    sent = 0
+    while queue:
+        text = queue.popleft()
+        response = _post_telegram(chat_id, text)
+        if response is not None and response.status_code == 400 and "parse entities" in response.text:
+            print("⚠️ Telegram could not parse Markdown, resending as plain text.")
+            response = _post_telegram(chat_id, text, parse_mode=None)
+        if response is None or response.status_code != 200:
+            detail = response.text if response is not None else "no response"
+            print(f"❌ Telegram message failed: {detail}")
+            break
+        sent += 1
+    return sent
+
+
+def send_telegram_report(text: str, chat_id: str = None):
+    """
+    Send a text message to Telegram using Markdown formatting.
+
+    Messages longer than Telegram's limit are split into several chunks
+    (see split_telegram_message) and sent in order.
+
+    Args:
+        text (str): Message body (Markdown allowed).
+        chat_id (str, optional): Optional override for the target chat.
+
+    Returns:
+        bool: True if every chunk was delivered.
+    """
+    chunks = split_telegram_message(text)
+    sent = send_telegram_messages(chunks, chat_id)
+    if sent and sent == len(chunks):
+        suffix = f" ({sent} messages)" if sent > 1 else ""
+        print(f"📨 Telegram notification sent{suffix}.")
+        return True
+    if sent:
+        print(f"❌ Telegram notification incomplete: {sent}/{len(chunks)} messages sent.")
+    return False
+
+
+def _outbox_write(path, entry):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+
+
+def _enqueue(channel, payload):
+    """
+    Spool a notification for the background flusher.
+
+    Returns:
+        str or None: Path of the spooled entry, or None if spooling failed.
+    """
+    now = time.time()
+    entry = {
+        "id": f"{time.time_ns()}-{uuid.uuid4().hex[:8]}",
+        "channel": channel,
+        "created": now,
+        "attempts": 0,
+        "next_attempt": now,
+        "last_error": None,
+        "payload": payload,
+    }
+    path = os.path.join(OUTBOX_DIR, f"{entry['id']}.json")
+    try:
+        os.makedirs(OUTBOX_DIR, exist_ok=True)
+        _outbox_write(path, entry)
+    except OSError as e:
+        print(f"⚠️ Failed to queue {channel} notification: {e}")
+        return None
+    print(f"📥 Queued {channel} notification in outbox.")
+    return path
 
+
+def queue_email_report(subject: str, html_body: str, email_to: str = None):
+    """
+    Queue an HTML email report for background delivery and return immediately.
+
+    Falls back to sending right away when the outbox is disabled
+    (NOTIFY_OUTBOX=false), and for the recipients whose entries could not
+    be written.
+
+    Args:
+        subject (str): Email subject.
+        html_body (str): HTML body content.
+        email_to (str, optional): Optional override for recipient(s).
+    """
+    recipients = [addr.strip() for addr in (email_to or EMAIL_TO or "").split(",") if addr.strip()]
+    if not all([SMTP_SERVER, SMTP_USER, SMTP_PWD, EMAIL_FROM, recipients]):
+        print("⚠️ Skipping email: SMTP config or recipient missing.")
+        return
+    if NOTIFY_OUTBOX:
+        # Spooled recipients get their copy from the flusher; only send the rest now
+        recipients = [
+            r for r in recipients
+            if not _enqueue("email", {"subject": subject, "html_body": html_body, "email_to": r})
+        ]
+        if not recipients:
+            return
+    send_email_report(subject, html_body, ",".join(recipients))
+
+
+def queue_telegram_report(text: str, chat_id: str = None):
+    """
+    Queue a Telegram message for background delivery and return immediately.
+
+    Falls back to sending right away when the outbox is disabled
+    (NOTIFY_OUTBOX=false) or cannot be written.
+
+    Args:
+        text (str): Message body (Markdown allowed).
+        chat_id (str, optional): Optional override for the target chat.
+    """
+    chat_id = chat_id or TELEGRAM_CHAT_ID
+    if not TELEGRAM_WEBHOOK or not chat_id:
+        print("⚠️ Skipping Telegram: config missing.")
+        return
+    if NOTIFY_OUTBOX and _enqueue("telegram", {"chunks": split_telegram_message(text), "chat_id": chat_id}):
+        return
+    send_telegram_report(text, chat_id)
+
+
+def _load_due_entries(now):
+    entries = []
     try:
-        response = requests.post(TELEGRAM_WEBHOOK, json=payload, timeout=10)
-        if response.status_code == 200:
-            print("📨 Telegram notification sent.")
-        else:
-            raise Exception(response.text)
-    except Exception as e:
-        print(f"❌ Telegram notification failed: {e}")
+        names = sorted(name for name in os.listdir(OUTBOX_DIR) if name.endswith(".json"))
+    except FileNotFoundError:
+        return entries
+    for name in names:
+        path = os.path.join(OUTBOX_DIR, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Skipping unreadable outbox entry {name}: {e}")
+            continue
+        if entry.get("next_attempt", 0) <= now:
+            entries.append((path, entry))
+    return entries
+
+
+def _deliver_emails(entries):
+    messages = [
+        (entry["payload"]["subject"], entry["payload"]["html_body"], entry["payload"]["email_to"])
+        for _, entry in entries
+    ]
+    results = send_email_batch(messages)
+    return [result["error"] if not result["sent"] else None for result in results]
+
+
+def _deliver_telegrams(entries):
+    errors = []
+    for path, entry in entries:
+        chunks = entry["payload"]["chunks"]
+        sent = send_telegram_messages(chunks, entry["payload"].get("chat_id"))
+        if sent == len(chunks):
+            errors.append(None)
+            continue
+        # Keep only what is left so a retry does not repeat delivered chunks
+        entry["payload"]["chunks"] = chunks[sent:]
+        errors.append(f"{sent}/{len(chunks)} messages sent")
+    return errors
+
+
+def _settle(path, entry, error):
+    """
+    Remove a delivered entry, or schedule its next attempt with backoff.
+    After OUTBOX_MAX_ATTEMPTS the entry is moved to OUTBOX_DIR/failed.
+    """
+    if error is None:
+        os.remove(path)
+        return "sent"
+    entry["attempts"] += 1
+    entry["last_error"] = error
+    if entry["attempts"] >= OUTBOX_MAX_ATTEMPTS:
+        failed_dir = os.path.join(OUTBOX_DIR, "failed")
+        os.makedirs(failed_dir, exist_ok=True)
+        _outbox_write(os.path.join(failed_dir, os.path.basename(path)), entry)
+        os.remove(path)
+        print(f"❌ Giving up on {entry['channel']} notification {entry['id']}: {error}")
+        return "failed"
+    delay = min(OUTBOX_RETRY_CAP, OUTBOX_RETRY_BASE * 2 ** (entry["attempts"] - 1))
+    entry["next_attempt"] = time.time() + random.uniform(delay / 2, delay)
+    _outbox_write(path, entry)
+    return "retry"
+
+
+def flush_outbox():
+    """
+    Deliver every due notification in the outbox.
+
+    Emails go out over one SMTP session while Telegram messages are sent
+    in parallel. Failed entries stay in the outbox and are retried by a
+    later flush with exponential backoff. Only one flusher runs at a time;
+    a concurrent call returns immediately.
+
+    Returns:
+        dict: Counts of 'sent', 'retry' and 'failed' entries.
+    """
+    counts = {"sent": 0, "retry": 0, "failed": 0}
+    os.makedirs(OUTBOX_DIR, exist_ok=True)
+    with open(os.path.join(OUTBOX_DIR, ".lock"), "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print("ℹ️ Outbox flush already running.")
+            return counts
+
+        entries = _load_due_entries(time.time())
+        if not entries:
+            return counts
+        by_channel = {
+            "email": [item for item in entries if item[1]["channel"] == "email"],
+            "telegram": [item for item in entries if item[1]["channel"] == "telegram"],
+        }
+        deliver = {"email": _deliver_emails, "telegram": _deliver_telegrams}
+        with ThreadPoolExecutor(max_workers=len(deliver)) as executor:
+            futures = {
+                channel: executor.submit(deliver[channel], items)
+                for channel, items in by_channel.items() if items
+            }
+        for channel, future in futures.items():
+            try:
+                errors = future.result()
+            except Exception as e:
+                errors = [str(e)] * len(by_channel[channel])
+            for (path, entry), error in zip(by_channel[channel], errors):
+                try:
+                    counts[_settle(path, entry, error)] += 1
+                except OSError as e:
+                    print(f"⚠️ Failed to update outbox entry {entry['id']}: {e}")
+    print(f"📤 Outbox flushed: {counts['sent']} sent, {counts['retry']} to retry, {counts['failed']} failed.")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Notification utilities")
+    parser.add_argument("--flush", action="store_true", help="Deliver queued notifications from the outbox")
+    args = parser.parse_args()
+    if args.flush:
+        flush_outbox()
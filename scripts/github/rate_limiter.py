@@ -0,0 +1,192 @@
+# rate_limiter.py
+
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+# === Rate Limit Config ===
+# Fraction of a bucket below which calls are spread evenly over the
+# remaining window instead of being sent at full speed.
+try:
+    LOW_WATER = float(os.getenv("GITHUB_RATE_LOW_WATER", 0.1))
+except ValueError:
+    print("⚠️ Invalid GITHUB_RATE_LOW_WATER, using default 0.1")
+    LOW_WATER = 0.1
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+SECONDARY_LIMIT_WAIT = 60.0
+
+# Documented defaults, corrected by response headers as soon as they arrive
+DEFAULT_LIMITS = {
+    "core": (5000, 3600),
+    "search": (30, 60),
+    "graphql": (5000, 3600),
+}
+
+
+class TokenBucket:
+    """
+    Client-side view of one GitHub rate-limit bucket.
+
+    Every request takes a token. The bucket is refilled from the
+    X-RateLimit-* headers GitHub returns, so it tracks the real server-side
+    quota; while quota is plentiful acquire() never sleeps.
+    """
+
+    def __init__(self, name, limit, window):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset = time.time() + window
+        self.next_slot = 0.0
+        self.paused_until = 0.0
+        self.seen = False
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, sleeping first if the bucket is empty or running low.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        with self.lock:
+            now = time.time()
+            if now >= self.reset:
+                self.remaining = self.limit
+                self.reset = now + self.window
+            wait = max(self.paused_until - now, 0.0)
+            if self.remaining <= 0:
+                wait = max(wait, self.reset - now + 1.0)
+            elif self.remaining < self.limit * LOW_WATER:
+                # Spread what is left evenly over the rest of the window
+                interval = (self.reset - now) / self.remaining
+                slot = max(now, self.next_slot)
+                self.next_slot = slot + interval
+                wait = max(wait, slot - now)
+            self.remaining -= 1
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def update(self, limit, remaining, reset):
+        with self.lock:
+            self.limit = limit or self.limit
+            self.remaining = remaining
+            self.reset = reset or self.reset
+            self.seen = True
+
+    def pause(self, seconds):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.time() + seconds)
+
+    def snapshot(self):
+        with self.lock:
+            return {"limit": self.limit, "remaining": self.remaining, "reset": int(self.reset)}
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(resource):
+    """
+    Return the shared bucket for a rate-limit resource ('core', 'search', ...).
+    """
+    with _buckets_lock:
+        bucket = _buckets.get(resource)
+        if bucket is None:
+            limit, window = DEFAULT_LIMITS.get(resource, DEFAULT_LIMITS["core"])
+            bucket = _buckets[resource] = TokenBucket(resource, limit, window)
+        return bucket
+
+
+def all_buckets():
+    with _buckets_lock:
+        return dict(_buckets)
+
+
+def pause(seconds, resource=None):
+    """
+    Hold back requests for a number of seconds.
+
+    Args:
+        seconds (float): How long to wait.
+        resource (str, optional): Bucket to pause; all buckets when omitted
+            (secondary rate limits apply to the whole account).
+    """
+    if resource:
+        get_bucket(resource).pause(seconds)
+        return
+    for name in DEFAULT_LIMITS:
+        get_bucket(name)
+    for bucket in all_buckets().values():
+        bucket.pause(seconds)
+
+
+def resource_for(url):
+    """
+    Map a request URL to the GitHub rate-limit resource it is charged to.
+    """
+    path = urlsplit(url).path
+    if path.startswith("/search/"):
+        return "search"
+    if path.startswith("/graphql"):
+        return "graphql"
+    return "core"
+
+
+def update_from_response(response, resource):
+    """
+    Refill the matching bucket from a response's X-RateLimit-* headers.
+    """
+    headers = response.headers
+    if "X-RateLimit-Remaining" not in headers:
+        return
+    resource = headers.get("X-RateLimit-Resource", resource)
+    try:
+        get_bucket(resource).update(
+            int(headers.get("X-RateLimit-Limit", 0)),
+            int(headers["X-RateLimit-Remaining"]),
+            int(headers.get("X-RateLimit-Reset", 0)),
+        )
+    except ValueError:
+        pass
+
+
+def retry_after_seconds(response):
+    """
+    Determine how long to back off after a rate-limited response.
+
+    Covers primary limits (remaining quota 0) and secondary limits
+    (403/429 with Retry-After or a 'secondary rate limit' message).
+
+    Returns:
+        float or None: Seconds to wait, or None if the response is not rate limited.
+    """
+    if response.status_code not in (403, 429):
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(float(retry_after), 1.0)
+        except ValueError:
+            pass
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        reset = int(response.headers.get("X-RateLimit-Reset", 0))
+        return max(reset - time.time(), 0) + 1.0
+    if "secondary rate limit" in response.text.lower():
+        return SECONDARY_LIMIT_WAIT
+    if response.status_code == 429:
+        return SECONDARY_LIMIT_WAIT
+    return None
+
+
+def backoff_delay(attempt):
+    """
+    Jittered exponential backoff ("full jitter") for the given retry attempt.
+    """
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
@@ -1,41 +1,96 @@
 import os
-import requests
-import time
-from report_utils import wrap_html_report
-from notify_utils import send_email_report
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+import github_client
+from report_utils import ReportBuilder, escape
+from notify_utils import queue_email_report
 
 # === ENVIRONMENT VARIABLES ===
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 GITHUB_USER = os.getenv("GITHUB_USER")
 
-REQUESTS_TIMEOUT = 10
-
 if not all([GITHUB_USER, GITHUB_TOKEN]):
     raise ValueError("❌ Missing one or more required environment variables.")
 
-HEADERS = {
-    "Authorization": f"token {GITHUB_TOKEN}",
-    "Accept": "application/vnd.github+json",
-    "User-Agent": "github-scripts-bot"
-}
+SEARCH_LIMIT = 1000  # GitHub search API limit
+SEARCH_EPOCH = datetime(2008, 1, 1, tzinfo=timezone.utc)  # nothing on GitHub is older
+try:
+    SHARD_WORKERS = int(os.getenv("ISSUE_SEARCH_WORKERS", 4))
+except ValueError:
+    print("⚠️ Invalid ISSUE_SEARCH_WORKERS, using default 4")
+    SHARD_WORKERS = 4
+
+def fetch_search(query, force=False):
+    """
+    Fetch all results of a search query if they fit under the search cap.
+
+    Args:
+        query (str): Search query.
+        force (bool): Return the first SEARCH_LIMIT results even if there are more.
+
+    Returns:
+        tuple[int, list | None]: total_count and the items, or None if the
+        query exceeds the cap (the caller should shard it).
+    """
+    response = github_client.get("/search/issues", params={"q": query, "per_page": 100})
+    response.raise_for_status()
+    data = response.json()
+    total = data.get("total_count", 0)
+    if total > SEARCH_LIMIT and not force:
+        return total, None
+    items = data.get("items", [])
+    next_url = response.links.get("next", {}).get("url")
+    if next_url:
+        items += github_client.paginate(next_url, items_key="items", max_items=SEARCH_LIMIT - len(items))
+    return total, items
+
+def _created_range(start, end):
+    fmt = "%Y-%m-%dT%H:%M:%SZ"
+    return f"created:{start.strftime(fmt)}..{end.strftime(fmt)}"
 
 def search_issues(query):
-    all_items = []
-    page = 1
-    while True:
-        # Add delay between requests to respect rate limits
-        time.sleep(0.1)        
-        url = f"https://api.github.com/search/issues?q={query}&per_page=100&page={page}"
-        response = requests.get(url, headers=HEADERS, timeout=REQUESTS_TIMEOUT)
-        response.raise_for_status()
-        items = response.json().get("items", [])
-        if not items:
-            break
-        all_items.extend(items)
-        page += 1
-        if len(all_items) >= 1000:  # GitHub search API limit
-            break
-    return all_items
+    """
+    Search issues, sharding on 'created:' date ranges when the query has
+    more results than the search API returns (1000).
+
+    Shards are split in half recursively until each one fits, fetched
+    concurrently and merged, de-duplicated by issue id.
+    """
+    total, items = fetch_search(query)
+    if items is not None:
+        return items
+
+    print(f"🔀 {total} results for '{query}' exceed the search limit, splitting by creation date")
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, SHARD_WORKERS)) as executor:
+        def submit(start, end):
+            # A one-second range cannot be split further; take what the API returns
+            force = end - start <= timedelta(seconds=1)
+            future = executor.submit(fetch_search, f"{query} {_created_range(start, end)}", force)
+            running[future] = (start, end)
+
+        def split(start, end):
+            middle = (start + (end - start) / 2).replace(microsecond=0)
+            submit(start, middle)
+            submit(middle + timedelta(seconds=1), end)
+
+        running = {}
+        split(SEARCH_EPOCH, now)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, end = running.pop(future)
+                shard_total, shard_items = future.result()
+                if shard_items is None:
+                    split(start, end)
+                    continue
+                if shard_total > len(shard_items):
+                    print(f"⚠️ {shard_total - len(shard_items)} results created at {start} could not be fetched")
+                for item in shard_items:
+                    results[item["id"]] = item
+
+    return sorted(results.values(), key=lambda item: item.get("created_at", ""), reverse=True)
 
 def format_labels(labels):
     if not labels:
@@ -55,41 +110,32 @@ def print_to_console(issue_data):
             print(f"    Labels: {labels} | Comments: {comments}")
             print(f"    {issue['html_url']} (by {issue['user']['login']})")
 
-def generate_html_report(issue_data):
-    html = ""
+def write_issue_sections(report, issue_data):
     for section, issues in issue_data.items():
         if not issues:
             continue  # Skip empty categories
-        html += f"""
-        <h3 style="border-bottom: 1px solid #eee; padding-bottom: 4px;">{section} ({len(issues)})</h3>
-        """
-        html += "<ul style='padding-left: 20px;'>"
+        report.section(section, len(issues))
+        report.begin_list()
         for issue in issues:
             repo = issue['repository_url'].split('/')[-1]
             labels = format_labels(issue.get("labels", []))
             comments = issue.get("comments", 0)
-            html += f"""
-            <li style="margin-bottom: 12px;">
-              <a href="{issue['html_url']}" style="color: #0366d6; text-decoration: none;">
-                #{issue['number']} {issue['title']}
-              </a>
-              <div style="font-size: 12px; color: #555;">
-                in <strong>{repo}</strong> by <em>{issue['user']['login']}</em><br/>
-                Labels: <em>{labels}</em> | Comments: <strong>{comments}</strong>
-              </div>
-            </li>
-            """
-        html += "</ul>"
-
-    # If after skipping empty categories, html is empty, add a fallback message
-    if not html.strip():
-        html = "<p style='color: #999;'>No open issues found.</p>"
-
-    return wrap_html_report(
-        content_html=html,
-        title="GitHub Issue Report",
-        github_user=GITHUB_USER
-    )
+            meta = (
+                f"in <strong>{escape(repo)}</strong> by <em>{escape(issue['user']['login'])}</em><br/>"
+                f"Labels: <em>{escape(labels)}</em> | Comments: <strong>{comments}</strong>"
+            )
+            report.item(issue['html_url'], f"#{issue['number']} {issue['title']}", meta_html=meta)
+        report.end_list()
+
+def generate_html_report(grouped_issues):
+    report = ReportBuilder(title="GitHub Issue Report", github_user=GITHUB_USER)
+    for repo_group_name, repo_group in grouped_issues.items():
+        report.group(repo_group_name)
+        if any(repo_group.values()):
+            write_issue_sections(report, repo_group)
+        else:
+            report.empty("No open issues found.")
+    return report.finish()
 
 def group_issues_by_repo_owner(issue_results):
     grouped = {
@@ -128,6 +174,7 @@ def main():
     }
 
     issue_results = {name: search_issues(query) for name, query in categories.items()}
+    github_client.print_call_stats()
 
     grouped_issues = group_issues_by_repo_owner(issue_results)
 
@@ -147,13 +194,10 @@ def main():
         print(f"\n=== {repo_group_name} ===")
         print_to_console(repo_group)
 
-    html = ""
-    for repo_group_name, repo_group in grouped_issues.items():
-        html += f"<h2 style='border-bottom: 2px solid #444;'>{repo_group_name}</h2>"
-        html += generate_html_report(repo_group)
+    html = generate_html_report(grouped_issues)
 
     subject = f"GitHub Issue Report for {GITHUB_USER}"
-    send_email_report(subject, html)
+    queue_email_report(subject, html)
 
 if __name__ == "__main__":
     main()
@@ -1,27 +1,22 @@
 import os
-import requests
-from report_utils import wrap_html_report
-from notify_utils import send_email_report
+import argparse
+import github_client
+from report_utils import ReportBuilder, escape
+from notify_utils import queue_email_report
 
 # === ENVIRONMENT VARIABLES ===
 GITHUB_USER = os.getenv("GITHUB_USER")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
-REQUESTS_TIMEOUT = 10
-
 if not all([GITHUB_USER, GITHUB_TOKEN]):
     raise ValueError("❌ Missing one or more required environment variables.")
 
-HEADERS = {
-    "Authorization": f"token {GITHUB_TOKEN}",
-    "Accept": "application/vnd.github+json"
-}
+SEARCH_LIMIT = 1000  # GitHub search API limit
+REPORT_MODE = os.getenv("REPORT_PRS_MODE", "queries")
 
 def search_prs(query):
-    url = f"https://api.github.com/search/issues?q={query}&per_page=100"
-    response = requests.get(url, headers=HEADERS, timeout=REQUESTS_TIMEOUT)
-    response.raise_for_status()
-    return response.json().get("items", [])
+    params = {"q": query, "per_page": 100}
+    return list(github_client.paginate("/search/issues", params=params, items_key="items", max_items=SEARCH_LIMIT))
 
 def print_to_console(pr_data):
     print(f"\n📄 GitHub PR Report for {GITHUB_USER}\n" + "-" * 40)
@@ -35,46 +30,77 @@ def print_to_console(pr_data):
             print(f"    {pr['html_url']} (by {pr['user']['login']})")
 
 def generate_html_report(pr_data):
-    html = ""
+    report = ReportBuilder(title="GitHub Pull Request Report", github_user=GITHUB_USER)
     for section, prs in pr_data.items():
-        html += f"""
-        <h3 style="border-bottom: 1px solid #eee; padding-bottom: 4px;">{section} ({len(prs)})</h3>
-        """
+        report.section(section, len(prs))
         if not prs:
-            html += "<p style='color: #999;'>No open pull requests found.</p>"
-        else:
-            html += "<ul style='padding-left: 20px;'>"
-            for pr in prs:
-                repo = pr['repository_url'].split('/')[-1]
-                html += f"""
-                <li style="margin-bottom: 8px;">
-                  <a href="{pr['html_url']}" style="color: #0366d6; text-decoration: none;">
-                    #{pr['number']} {pr['title']}
-                  </a>
-                  <div style="font-size: 12px; color: #555;">
-                    in <strong>{repo}</strong> by <em>{pr['user']['login']}</em>
-                  </div>
-                </li>
-                """
-            html += "</ul>"
-
-    return wrap_html_report(
-        content_html=html,
-        title="GitHub Pull Request Report",
-        github_user=GITHUB_USER
-    )
-
-def main():
-    print(f"📡 Fetching open pull requests for {GITHUB_USER}...\n")
+            report.empty("No open pull requests found.")
+            continue
+        report.begin_list()
+        for pr in prs:
+            repo = pr['repository_url'].split('/')[-1]
+            meta = f"in <strong>{escape(repo)}</strong> by <em>{escape(pr['user']['login'])}</em>"
+            report.item(pr['html_url'], f"#{pr['number']} {pr['title']}", meta_html=meta)
+        report.end_list()
+    return report.finish()
 
+def fetch_by_category_queries():
     categories = {
         "Created by you": f"is:pr is:open author:{GITHUB_USER}",
         "Assigned to you": f"is:pr is:open assignee:{GITHUB_USER}",
         "Mentioning you": f"is:pr is:open mentions:{GITHUB_USER}",
         "Review requested from you": f"is:pr is:open review-requested:{GITHUB_USER}"
     }
+    return {name: search_prs(query) for name, query in categories.items()}
+
+def classify_prs(involved, mentioning, review_requested):
+    """
+    Splits the result of an 'involves:' search into the report categories.
+
+    'involves:' is the union of author, assignee, mentions and commenter.
+    Author and assignee are exact from the payload; mentions are not (they
+    may be in comments or team mentions), and review requests are not part
+    of 'involves:' at all, so both come from their own queries. The
+    categories match those of fetch_by_category_queries.
+    """
+    user = GITHUB_USER.lower()
+    results = {
+        "Created by you": [],
+        "Assigned to you": [],
+        "Mentioning you": mentioning,
+        "Review requested from you": review_requested
+    }
+    for pr in involved:
+        if pr["user"]["login"].lower() == user:
+            results["Created by you"].append(pr)
+        if any(a["login"].lower() == user for a in pr.get("assignees") or []):
+            results["Assigned to you"].append(pr)
+    return results
+
+def fetch_by_involvement():
+    # 3 searches instead of 4: author and assignee are taken from the 'involves:' results
+    involved = search_prs(f"is:pr is:open involves:{GITHUB_USER}")
+    mentioning = search_prs(f"is:pr is:open mentions:{GITHUB_USER}")
+    review_requested = search_prs(f"is:pr is:open review-requested:{GITHUB_USER}")
+    return classify_prs(involved, mentioning, review_requested)
+
+def main():
+    parser = argparse.ArgumentParser(description="Email a report of open pull requests involving the user")
+    parser.add_argument(
+        "--mode",
+        choices=["queries", "involves"],
+        default=REPORT_MODE,
+        help="'queries' runs one search per category; 'involves' takes authored and assigned PRs from one 'involves:' search"
+    )
+    args = parser.parse_args()
+
+    print(f"📡 Fetching open pull requests for {GITHUB_USER}...\n")
 
-    pr_results = {name: search_prs(query) for name, query in categories.items()}
+    if args.mode == "involves":
+        pr_results = fetch_by_involvement()
+    else:
+        pr_results = fetch_by_category_queries()
+    github_client.print_call_stats()
 
     # Check if there's at least one PR
     total_pr_count = sum(len(prs) for prs in pr_results.values())
@@ -86,7 +112,7 @@ def main():
     html_report = generate_html_report(pr_results)
 
     subject = f"GitHub PR Report for {GITHUB_USER}"
-    send_email_report(subject, html_report)
+    queue_email_report(subject, html_report)
 
 if __name__ == "__main__":
     main()
@@ -1,9 +1,174 @@
 # report_utils.py
 
+import io
 import os
 import html
+from contextlib import ExitStack
 from datetime import datetime
 
+# Shared styles, emitted once in <head> instead of inline on every element
+REPORT_STYLE = """
+  body { font-family: Arial, sans-serif; background: #f5f5f5; padding: 20px; }
+  .report { max-width: 700px; margin: auto; background: white; padding: 20px; border-radius: 8px; box-shadow: 0 0 8px rgba(0,0,0,0.1); }
+  .report-header { text-align: center; margin-bottom: 20px; }
+  .report-header h2 { color: #333; }
+  .report-header .for { color: #666; }
+  .report-header .generated { color: #aaa; font-size: 12px; }
+  h2.group { border-bottom: 2px solid #444; }
+  h3.section { border-bottom: 1px solid #eee; padding-bottom: 4px; }
+  ul.items { padding-left: 20px; }
+  ul.items li { margin-bottom: 10px; }
+  ul.items a { color: #0366d6; text-decoration: none; }
+  .meta { font-size: 12px; color: #555; }
+  .empty { color: #999; }
+  .report-footer { margin-top: 30px; font-size: 11px; color: #aaa; text-align: center; }
+"""
+
+# Page templates; per-element markup lives in ReportBuilder as f-strings,
+# which Python compiles once with the module
+HEADER_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+<title>{title}</title>
+<style>{style}</style>
+</head>
+<body>
+<div class="report">
+<div class="report-header">
+<img src="https://github.githubassets.com/images/modules/logos_page/GitHub-Mark.png" width="64" height="64" />
+<h2>{title}</h2>
+<p class="for">for <strong>{github_user}</strong></p>
+<p class="generated">Generated on {timestamp}</p>
+</div>
+"""
+FOOTER_TEMPLATE = """<div class="report-footer">Generated by your reporting script</div>
+</div>
+</body>
+</html>
+"""
+
+def escape(text):
+    """
+    Escape text for use in HTML content and attribute values.
+    """
+    return html.escape(str(text))
+
+
+class ReportBuilder:
+    """
+    Streams an HTML report into a buffer or straight into a file.
+
+    Parts are written once, in order, so building a report is linear in its
+    size. Text arguments are escaped; arguments ending in '_html' are
+    trusted markup.
+
+    Example:
+        builder = ReportBuilder("GitHub PR Report", "octocat")
+        builder.section("Created by you", len(prs))
+        builder.begin_list()
+        for pr in prs:
+            builder.item(pr["html_url"], f"#{pr['number']} {pr['title']}")
+        builder.end_list()
+        report = builder.finish()
+
+    When streaming to output_path, use the builder as a context manager so
+    the file is closed, and an unfinished report removed, if building fails:
+
+        with ReportBuilder("GitHub PR Report", "octocat", output_path=path) as builder:
+            ...
+            builder.finish()
+    """
+
+    def __init__(self, title="HTML Report", github_user="GitHub User", output_path=None):
+        self.output_path = output_path
+        self._finished = False
+        self._stack = ExitStack()
+        if output_path:
+            output_dir = os.path.dirname(output_path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            self._out = self._stack.enter_context(open(output_path, "w", encoding="utf-8"))
+        else:
+            self._out = io.StringIO()
+        self._write = self._out.write
+        try:
+            self._write(HEADER_TEMPLATE.format(
+                title=escape(title),
+                github_user=escape(github_user),
+                timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                style=REPORT_STYLE,
+            ))
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        """
+        Close the output file. A report that was not finished is removed
+        rather than left half-written on disk.
+        """
+        self._stack.close()
+        if not self._finished and self.output_path and os.path.exists(self.output_path):
+            os.remove(self.output_path)
+
+    def group(self, title):
+        self._write(f'<h2 class="group">{escape(title)}</h2>\n')
+
+    def section(self, title, count):
+        self._write(f'<h3 class="section">{escape(title)} ({count})</h3>\n')
+
+    def begin_list(self):
+        self._write('<ul class="items">\n')
+
+    def end_list(self):
+        self._write("</ul>\n")
+
+    def item(self, url, label, suffix="", meta_html=""):
+        """
+        Write one list item.
+
+        Args:
+            url (str): Link target.
+            label (str): Link text.
+            suffix (str): Plain text shown after the link.
+            meta_html (str): Trusted markup for the small grey line under the link.
+        """
+        suffix = escape(suffix) if suffix else ""
+        meta = f'<div class="meta">{meta_html}</div>' if meta_html else ""
+        self._write(f'<li><a href="{escape(url)}">{escape(label)}</a>{suffix}{meta}</li>\n')
+
+    def empty(self, message):
+        self._write(f'<p class="empty">{escape(message)}</p>\n')
+
+    def raw(self, content_html):
+        self._write(content_html)
+
+    def finish(self):
+        """
+        Write the footer and return the report.
+
+        Returns:
+            str or None: The complete HTML report, or None when it was
+            streamed to output_path.
+        """
+        self._write(FOOTER_TEMPLATE)
+        if not self.output_path:
+            self._finished = True
+            return self._out.getvalue()
+        self._stack.close()
+        self._finished = True
+        print(f"[INFO] HTML report written to: {self.output_path}")
+        return None
+
+
 def wrap_html_report(content_html, title="HTML Report", github_user="GitHub User", output_path=None):
     """
     Wraps provided HTML content with a consistent header and footer.
@@ -17,46 +182,18 @@ def wrap_html_report(content_html, title="HTML Report", github_user="GitHub User
     Returns:
         str: The complete HTML report.
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    # Escape user inputs to prevent XSS (except content_html which is expected to contain HTML)  
-    escaped_title = html.escape(title)  
-    escaped_github_user = html.escape(github_user)  
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <title>{escaped_title}</title>
-    </head>
-    <body style="font-family: Arial, sans-serif; background: #f5f5f5; padding: 20px;">
-      <div style="max-width: 700px; margin: auto; background: white; padding: 20px; border-radius: 8px; box-shadow: 0 0 8px rgba(0,0,0,0.1);">
-        <div style="text-align: center; margin-bottom: 20px;">
-          <img src="https://github.githubassets.com/images/modules/logos_page/GitHub-Mark.png" width="64" height="64" />
-          <h2 style="color: #333;">{escaped_title}</h2>
-          <p style="color: #666;">for <strong>{escaped_github_user}</strong></p>
-          <p style="color: #aaa; font-size: 12px;">Generated on {timestamp}</p>
-        </div>
-
-        {content_html}
-
-        <div style="margin-top: 30px; font-size: 11px; color: #aaa; text-align: center;">
-          Generated by your reporting script
-        </div>
-      </div>
-    </body>
-    </html>
-    """
-
+    builder = ReportBuilder(title=title, github_user=github_user)
+    builder.raw(content_html)
+    html_content = builder.finish()
     if output_path:
         try:
             output_dir = os.path.dirname(output_path)
             if output_dir:
                 os.makedirs(output_dir, exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
+            with open(output_path, "w", encoding="utf-8") as f:
                 f.write(html_content)
-            print(f"[INFO] HTML report written to: {output_path}")
-        except Exception as e:
+        except OSError as e:
             print(f"[ERROR] Failed to write HTML report to {output_path}: {e}")
             raise
-
-    return html_content
\ No newline at end of file
+        print(f"[INFO] HTML report written to: {output_path}")
+    return html_content